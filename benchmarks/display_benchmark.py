@@ -0,0 +1,129 @@
+"""Time the GUI thread's work per displayed frame for a grid of Microscopes.
+
+Run with e.g. `python benchmarks/display_benchmark.py --widgets 16 --size 1280x720`,
+`QT_QPA_PLATFORM=offscreen` works for comparing runs on a headless machine.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+from qtpy.QtWidgets import QApplication, QGridLayout, QWidget
+
+from qmicroscope.microscope import Microscope
+from qmicroscope.utils.arrays import array_to_qimage
+from qmicroscope.utils.frame import Frame
+from qmicroscope.widgets.video_wall import VideoWall
+
+
+def make_frames(width: int, height: int, count: int = 8):
+    frames = []
+    for i in range(count):
+        array = np.full((height, width, 3), i * 30 % 255, dtype=np.uint8)
+        frames.append(array_to_qimage(array))
+    return frames
+
+
+def run_wall(args) -> float:
+    app = QApplication.instance() or QApplication(sys.argv)
+    wall = VideoWall()
+    wall.columns = max(1, int(args.widgets**0.5))
+    wall.smooth_scaling = not args.fast
+    for i in range(args.widgets):
+        wall.addTile(f"camera{i}")
+    wall.resize(1200, 900)
+    wall.show()
+    images = make_frames(args.width, args.height)
+
+    def display(index: int):
+        for i in range(args.widgets):
+            wall.setImage(i, images[index % len(images)])
+        app.processEvents()
+
+    for i in range(args.warmup):
+        display(i)
+    started = time.perf_counter()
+    for i in range(args.frames):
+        display(i)
+    elapsed = time.perf_counter() - started
+    return elapsed / (args.frames * args.widgets)
+
+
+def run(args) -> float:
+    if args.wall:
+        return run_wall(args)
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = QWidget()
+    layout = QGridLayout(window)
+    columns = max(1, int(args.widgets**0.5))
+    microscopes = []
+    for i in range(args.widgets):
+        microscope = Microscope(window)
+        if args.scale:
+            microscope.scale = [args.scale, 0]
+        microscope.scale_in_view = not args.resample
+        microscope.smooth_scaling = not args.fast
+        microscope.direct_paint = not args.pixmap
+        layout.addWidget(microscope, i // columns, i % columns)
+        microscopes.append(microscope)
+    window.show()
+    images = make_frames(args.width, args.height)
+
+    def display(index: int):
+        for microscope in microscopes:
+            if args.always_relayout:
+                # What every frame cost before the geometry was only redone on change
+                microscope._display_size = None
+            microscope.updateImageData(Frame(images[index % len(images)]))
+        app.processEvents()
+
+    for i in range(args.warmup):
+        display(i)
+    started = time.perf_counter()
+    for i in range(args.frames):
+        display(i)
+    elapsed = time.perf_counter() - started
+    return elapsed / (args.frames * args.widgets)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--widgets", type=int, default=16)
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--size", default="640x480", help="frame WIDTHxHEIGHT")
+    parser.add_argument("--scale", type=int, default=0, help="scale frames to width")
+    parser.add_argument(
+        "--resample",
+        action="store_true",
+        help="resample scaled frames instead of scaling them in the view",
+    )
+    parser.add_argument(
+        "--fast", action="store_true", help="scale without interpolation"
+    )
+    parser.add_argument(
+        "--pixmap",
+        action="store_true",
+        help="show frames with a QGraphicsPixmapItem instead of painting them",
+    )
+    parser.add_argument(
+        "--always-relayout",
+        action="store_true",
+        help="redo the scene and view geometry on every frame",
+    )
+    parser.add_argument(
+        "--wall",
+        action="store_true",
+        help="paint the frames as tiles of one VideoWall instead of Microscopes",
+    )
+    args = parser.parse_args()
+    args.width, args.height = (int(v) for v in args.size.split("x"))
+    per_frame = run(args)
+    print(
+        f"{args.widgets} widgets, {args.size} frames: "
+        f"{per_frame * 1000:.3f} ms of GUI thread time per widget frame"
+    )
+
+
+if __name__ == "__main__":
+    main()
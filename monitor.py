@@ -30,6 +30,7 @@ from qmicroscope.plugins import (
     ZoomPlugin,
 )
 from qmicroscope.settings import Settings
+from qmicroscope.widgets.qos import FOCUSED, THUMBNAIL, QosTier
 
 
 class Form(QMainWindow):
@@ -37,7 +38,12 @@ class Form(QMainWindow):
         super(Form, self).__init__(parent)
         # Create widgets
         self.setWindowTitle("NSLS-II Microscope Widget")
-        self.container = Container(self, plugins=[TogglePlugin])
+        # The thumbnails are throttled to leave the budget to the main microscope
+        self.container = Container(self, plugins=[TogglePlugin], qos=True)
+        # The focused camera is shown by main_microscope as well, its thumbnail
+        # doesn't need more than the others
+        tiers = self.container.tiers
+        tiers[FOCUSED] = QosTier(fps=tiers[THUMBNAIL].fps)
         self.container.count = 3
         self.container.size = [2, 2]
         self.microscope = self.container.microscope(0)
@@ -2,13 +2,49 @@ from qtpy.QtWidgets import QWidget, QGridLayout
 from qtpy.QtGui import QPaintEvent
 from qtpy.QtCore import QSettings
 from qmicroscope.microscope import Microscope
-from typing import List
+from qmicroscope.widgets.display import DisplayScheduler
+from qmicroscope.widgets.engine import AcquisitionEngine
+from qmicroscope.widgets.video_wall import VideoWall
+from qmicroscope.widgets.qos import (
+    BACKGROUND,
+    FOCUSED,
+    THUMBNAIL,
+    QosTier,
+    default_tiers,
+)
+from typing import Dict, List, Optional
 
 """ A widget that contains one or more microscope widgets in a grid. """
 
 
 class Container(QWidget):
-    def __init__(self, parent: "QWidget|None" = None, plugins=None):
+    def __init__(
+        self,
+        parent: "QWidget|None" = None,
+        plugins=None,
+        engine: bool = False,
+        max_display_hz: float = 30.0,
+        qos: bool = False,
+        wall: bool = False,
+    ):
+        """
+        Args:
+            parent: Parent widget, its setup_main_microscope slot (if it has one) is
+                connected to every microscope's clicked_url signal.
+            plugins: Plugin classes to create for every microscope.
+            engine: Acquire all the cameras on a single AcquisitionEngine event loop
+                instead of a VideoThread per camera.
+            max_display_hz: Maximum number of times a second the microscopes' new
+                frames are shown, all in the same pass. 0 shows every frame as soon
+                as it arrives.
+            qos: Share the CPU and network budget by putting the microscopes in
+                QoS tiers (see `tiers`). The focused one, the last one clicked,
+                keeps its own frame rate and resolution.
+            wall: Paint every camera as a tile of a single VideoWall instead of
+                creating a Microscope for each, for large overviews. The cameras'
+                URLs and frame rates are read from the settings, and there are no
+                plugins or Microscopes to configure.
+        """
         super(Container, self).__init__(parent)
         if not plugins:
             self.plugins = []
@@ -20,25 +56,36 @@ class Container(QWidget):
         self._size = [1, 1]  # The size of the container in widgets
         self._horizontal: bool = True  # When setting the count prefer horizontal
 
+        self.engine: Optional[AcquisitionEngine] = (
+            AcquisitionEngine() if engine else None
+        )
+
+        self.display_scheduler = DisplayScheduler(max_display_hz, self)
+
+        # Frame rate and decode resolution by tier, None if QoS is off
+        self.tiers: Optional[Dict[str, QosTier]] = default_tiers() if qos else None
+        self._focused: Optional[Microscope] = None
+
         self._widgets: "List[Microscope]" = []
-        microscope_widget = Microscope(self, plugins=self.plugins)
-        if hasattr(self.parent_widget, "setup_main_microscope"):
-            microscope_widget.clicked_url.connect(
-                self.parent_widget.setup_main_microscope
-            )
         # else:
         # microscope_widget = Microscope(self, viewport=False, plugins=self.plugins)
 
-        self._widgets.append(microscope_widget)
+        self.wall: Optional[VideoWall] = None
+        if wall:
+            self.wall = VideoWall(self, max_display_hz, self.engine)
+            if hasattr(self.parent_widget, "setup_main_microscope"):
+                self.wall.clicked_url.connect(self.parent_widget.setup_main_microscope)
+        else:
+            self._widgets.append(self._create_microscope())
 
         self._grid = QGridLayout()
         self._grid.setSpacing(1)
         self._grid.setContentsMargins(0, 0, 0, 0)
         self.setLayout(self._grid)
-        self.layout().addWidget(self._widgets[0])
+        self.layout().addWidget(self.wall if wall else self._widgets[0])
 
     def microscope(self, num: int) -> "Microscope|None":
-        if num > len(self._widgets):
+        if num >= len(self._widgets):
             return None
         return self._widgets[num]
 
@@ -96,20 +143,70 @@ class Container(QWidget):
         """Start all of the camera widgets."""
         for m in self._widgets:
             m.acquire(acq)
+        if self.wall:
+            self.wall.start(acq)
+        if self.engine and not acq:
+            self.engine.stop()
 
     def updateWidgets(self) -> None:
         """Instantiate/show objects."""
+        if self.wall:
+            # The wall's tiles are created from the settings
+            return
         if len(self._widgets) > self._count:
             self._widgets = self._widgets[: self._count]
         while len(self._widgets) < self._count:
-            microscope_widget = Microscope(self, plugins=self.plugins)
-            if hasattr(self.parent_widget, "setup_main_microscope"):
-                microscope_widget.clicked_url.connect(
-                    self.parent_widget.setup_main_microscope
-                )
-            self._widgets.append(microscope_widget)
+            self._widgets.append(self._create_microscope())
+
+    def _create_microscope(self) -> Microscope:
+        microscope_widget = Microscope(self, plugins=self.plugins)
+        microscope_widget.engine = self.engine
+        if self.display_scheduler.max_hz > 0:
+            microscope_widget.display_scheduler = self.display_scheduler
+        microscope_widget.clicked_url.connect(self.setFocused)
+        microscope_widget.visibilityChanged.connect(self.updateTiers)
+        if hasattr(self.parent_widget, "setup_main_microscope"):
+            microscope_widget.clicked_url.connect(
+                self.parent_widget.setup_main_microscope
+            )
+        self._applyTier(microscope_widget)
+        return microscope_widget
+
+    @property
+    def focused(self) -> Optional[Microscope]:
+        return self._focused
+
+    def setFocused(self, settings_group: Optional[str]) -> None:
+        """Make the microscope with these settings the focused one, as when it is
+        clicked, or none if None."""
+        self._focused = None
+        for m in self._widgets:
+            if settings_group and m.settings_group == settings_group:
+                self._focused = m
+        self.updateTiers()
+
+    def tier(self, microscope: Microscope) -> str:
+        """The QoS tier a microscope belongs in."""
+        if microscope is self._focused:
+            return FOCUSED
+        if microscope.hidden:
+            return BACKGROUND
+        return THUMBNAIL
+
+    def updateTiers(self) -> None:
+        """Apply the QoS tiers, after the focus or a microscope's visibility changed."""
+        for m in self._widgets:
+            self._applyTier(m)
+
+    def _applyTier(self, microscope: Microscope) -> None:
+        if self.tiers is not None:
+            microscope.setQos(self.tiers[self.tier(microscope)])
 
     def paintEvent(self, event: QPaintEvent) -> None:
+        if self._update and self.wall:
+            self.wall.columns = self._size[0]
+            self.wall.update()
+            self._update = False
         if self._update:
             print("updating")
             # We need to update the number of widgets, get the layout right.
@@ -138,6 +235,17 @@ class Container(QWidget):
         sz[0] = settings.value("cols", 1, type=int)
         sz[1] = settings.value("rows", 1, type=int)
         self.size = sz
+        if self.wall:
+            self.wall.clear()
+            for i in range(self._count):
+                settings.beginGroup(f"Camera{i}")
+                self.wall.addTile(
+                    settings.value("url", "http://localhost:9998/jpg/image.jpg"),
+                    settings.value("fps", 5, type=int),
+                    settings.group(),
+                )
+                settings.endGroup()
+            self.wall.columns = sz[0]
         # Ensure the widgets are created, then load their settings.
         self.updateWidgets()
         for i in range(len(self._widgets)):
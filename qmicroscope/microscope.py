@@ -1,8 +1,19 @@
 from collections.abc import Iterable
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from PyQt5 import QtGui
-from qtpy.QtCore import QByteArray, QEvent, QPoint, QSettings, QSize, Qt, Signal
+from qtpy.QtCore import (
+    QByteArray,
+    QEvent,
+    QPoint,
+    QPointF,
+    QRect,
+    QRectF,
+    QSettings,
+    QSize,
+    Qt,
+    Signal,
+)
 from qtpy.QtGui import (
     QContextMenuEvent,
     QImage,
@@ -23,12 +34,24 @@ from qtpy.QtWidgets import (
 
 from .plugin_settings import PluginSettingsDialog
 from .plugins.base_plugin import BasePlugin, SupportsBasePlugin
+from .utils.frame import Frame
+from .utils.history import FrameHistory
+from .utils.mailbox import FrameMailbox
+from .utils.pipeline import FramePipeline
+from .utils.stats import FrameStats
 from .widgets.downloader import VideoThread
+from .widgets.display import DisplayScheduler
+from .widgets.engine import AcquisitionEngine
+from .widgets.image_item import ImageItem
+from .widgets.qos import QosTier
+from .widgets.sources import SharedSource, source_registry
 
 
 class Microscope(QWidget):
     roiClicked: Signal = Signal(int, int)
     clicked_url: Signal = Signal(str)
+    # Emitted with whether the widget can be seen when that changes
+    visibilityChanged: Signal = Signal(bool)
     mouse_press_signal: Signal = Signal(object)
     mouse_move_signal: Signal = Signal(object)
     mouse_release_signal: Signal = Signal(object)
@@ -54,6 +77,9 @@ class Microscope(QWidget):
         self.view.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
         self.view.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
         self.scene.addItem(self.pixmap)
+        # Paints frames without converting them to a QPixmap first, see direct_paint
+        self.imageItem = ImageItem()
+        self.scene.addItem(self.imageItem)
         self.layout = QVBoxLayout()
         self.layout.addWidget(self.view)
         self.setLayout(self.layout)
@@ -64,11 +90,44 @@ class Microscope(QWidget):
         self.color: bool = False
         self.fps: int = 5
         self.scale: List[int] = []
+        # Seconds between receiving the last frame and handing it to the view
+        self.display_delay: float = 0.0
+        # Scale frames for display with the pixmap item's transform rather than
+        # resampling every frame, and whether to interpolate when scaling
+        self.scale_in_view: bool = True
+        self.smooth_scaling: bool = True
+        # Paint frames with imageItem rather than uploading them to the pixmap item
+        self.direct_paint: bool = True
+        self._resample_factor = 1.0
+        # Seconds of frames to keep in memory for looking back, 0 to keep none
+        self.history_seconds: float = 0.0
+        # The frame on display, after the plugins have processed it
+        self.frame: Optional[Frame] = None
+        # Rate, latency and timings of the frames displayed, see frameStats
+        self.stats = FrameStats()
+        # Frame rate while the widget can't be seen, 0 pauses acquisition
+        self.hidden_fps: float = 0.0
+        self._hidden = False
+        # Set by Container to share the CPU and network budget, see setQos
+        self.qos: Optional[QosTier] = None
+        self._window: Optional[QWidget] = None
 
         self.url: str = "http://localhost:8080/output.jpg"
 
-        self.videoThread = VideoThread(fps=self.fps, url=self.url, parent=self)
-        self.videoThread.imageReady.connect(self.updateImageData)
+        # Set by Container to acquire on a shared event loop instead of a thread
+        self.engine: Optional[AcquisitionEngine] = None
+        # Frames are fetched and decoded once per URL, however many widgets show them.
+        # The source puts them straight into the mailbox from the decode threads, so a
+        # slow GUI thread only ever has the newest frame waiting for it.
+        self.source: Optional[SharedSource] = None
+        self._decode_size: Optional[Tuple[int, int]] = None
+        # Size of the frame on display, the geometry is redone when it changes
+        self._display_size: Optional[QSize] = None
+        self.videoThread: VideoThread = source_registry.source(self.url).thread
+        self.mailbox = FrameMailbox(self)
+        self.mailbox.frameReady.connect(self._frameReady)
+        # Set by Container, to show its microscopes' frames in one pass per tick
+        self.display_scheduler: Optional[DisplayScheduler] = None
 
         self.plugins: Dict[str, BasePlugin] = {}
         for plugin_cls in self.plugin_classes:
@@ -87,35 +146,142 @@ class Microscope(QWidget):
             self.key_press_signal.connect(plugin.key_press_event)
             self.key_release_signal.connect(plugin.key_release_event)
 
+        # The plugins that transform frames, rebuilt by pluginsChanged
+        self._pipeline: Optional[FramePipeline] = None
+
         self.view.viewport().installEventFilter(self)
         self.view.installEventFilter(self)
 
     def updatedImageSize(self) -> None:
-        if self.image.size() != self.minimumSize():
-            self.setMinimumSize(self.image.size())
-            self.center = QPoint(
-                int(self.image.size().width() / 2), int(self.image.size().height() / 2)
-            )
+        size = self.displaySize()
+        if size != self.minimumSize():
+            self.setMinimumSize(size)
+            self.center = QPoint(int(size.width() / 2), int(size.height() / 2))
 
     def acquire(self, start: bool = True) -> None:
         if start:
-            self.videoThread.setUrl(self.url)
-            self.videoThread.setFPS(self.fps)
-            self.videoThread.start()
+            self._watchWindow()
+            if self.window().isVisible():
+                # A widget in a tab that was never opened gets no hide event
+                self.updateVisibility()
+            self._subscribe(self.url)
             for plugin in self.plugins.values():
                 plugin.start_plugin()
-        elif self.videoThread.isRunning() and not start:
+        elif not start and self.source is not None:
             for plugin in self.plugins.values():
                 plugin.stop_plugin()
-            self.videoThread.stop()
-            self.videoThread.wait(500)
+            self.source.unsubscribe(self.mailbox)
+            self.source = None
+
+    @property
+    def history(self) -> Optional[FrameHistory]:
+        """The recent frames of the camera on display, if history_seconds is set."""
+        return self.videoThread.history
+
+    def setSource(self, url: str) -> None:
+        """Switch to the feed from another URL while acquiring.
+
+        Unlike changing `url` this takes effect straight away and isn't saved in the
+        settings. Does nothing if the microscope isn't acquiring.
+        """
+        if self.source is not None and self.source.url != url:
+            self._subscribe(url)
+
+    def _subscribe(self, url: str) -> None:
+        """Receive the feed from a URL, shared with every other widget showing it."""
+        if self.source is not None and self.source.url != url:
+            self.source.unsubscribe(self.mailbox, wait=False)
+        self.source = source_registry.subscribe(
+            url, self.mailbox, self.acquisitionFps(), self.engine
+        )
+        self.videoThread = self.source.thread
+        if self.history_seconds > 0:
+            self.videoThread.enable_history(self.history_seconds)
+        self._decode_size = None
+        self.updateDecodeSize()
 
     def stop_plugins(self):
         "For cleaning up threads and other processes"
         for plugin in self.plugins.values():
             plugin.stop_plugin()
 
+    @property
+    def hidden(self) -> bool:
+        """Whether the widget can't be seen although its window was shown: hidden,
+        minimised or in a tab that isn't open."""
+        return self._hidden
+
+    def isShown(self) -> bool:
+        """Whether the widget can be seen: not hidden, in a hidden tab or minimised."""
+        return self.isVisible() and not self.window().isMinimized()
+
+    def acquisitionFps(self) -> float:
+        """The frame rate to acquire at, `hidden_fps` while the widget can't be seen.
+
+        With a QoS tier the tier's frame rate applies instead, the Container
+        managing it puts hidden widgets in the background tier. Plugins with
+        keep_acquiring set, like the Record plugin while recording, get frames at
+        the full rate regardless.
+        """
+        if any(
+            getattr(plugin, "keep_acquiring", False) for plugin in self.plugins.values()
+        ):
+            return self.fps
+        if self.qos is not None:
+            if self.qos.fps is None:
+                return self.fps
+            return min(self.fps, self.qos.fps)
+        if self._hidden:
+            return self.hidden_fps
+        return self.fps
+
+    def setQos(self, tier: Optional[QosTier]) -> None:
+        """Limit the frame rate and decode resolution, None to lift the limits."""
+        if tier != self.qos:
+            self.qos = tier
+            self.updateAcquisitionRate()
+            self.updateDecodeSize()
+
+    def updateAcquisitionRate(self) -> None:
+        """Let the source know if the frame rate this widget wants changed."""
+        if self.source is not None:
+            self.source.set_fps(self.mailbox, self.acquisitionFps())
+
+    def updateVisibility(self) -> None:
+        """Slow down or pause acquisition when the widget is hidden or minimised,
+        and restore it as soon as it is shown again."""
+        hidden = not self.isShown()
+        if hidden != self._hidden:
+            self._hidden = hidden
+            self.updateAcquisitionRate()
+            self.visibilityChanged.emit(not hidden)
+
+    def _watchWindow(self) -> None:
+        """Follow the window being shown and minimised, which doesn't show or hide
+        this widget if it is in a tab that was never opened, or on every platform
+        when minimising."""
+        window = self.window()
+        if window is not self._window:
+            if self._window is not None:
+                self._window.removeEventFilter(self)
+            self._window = window
+            window.installEventFilter(self)
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        self._watchWindow()
+        self.updateVisibility()
+
+    def hideEvent(self, event) -> None:
+        super().hideEvent(event)
+        self.updateVisibility()
+
     def eventFilter(self, obj, event):
+        if obj is self._window and event.type() in (
+            QEvent.Show,
+            QEvent.WindowStateChange,
+        ):
+            self.updateVisibility()
         if obj is self.view.viewport():
             if event.type() == QEvent.MouseButtonPress:
                 self.mouse_press_event(event)
@@ -190,47 +356,216 @@ class Microscope(QWidget):
         plugin_settings_dialog = PluginSettingsDialog(
             parent=self, plugins=self.plugins.values()
         )
+        plugin_settings_dialog.settingsApplied.connect(self.pluginsChanged)
 
     def sizeHint(self) -> QSize:
         return QSize(400, 400)
 
-    def updateImageData(self, image: QImage):
+    def _frameReady(self) -> None:
+        if self.display_scheduler is not None:
+            self.display_scheduler.schedule(self)
+        else:
+            self.takeFrame()
+
+    def takeFrame(self) -> None:
+        """Display the newest frame waiting in the mailbox."""
+        frame = self.mailbox.take()
+        if frame is not None:
+            self.updateImageData(frame)
+
+    def updateImageData(self, image: "Frame|QImage|QByteArray"):
         """Triggered when the new image is ready, update the view."""
         if isinstance(image, QByteArray):
             self.image.loadFromData(image, "JPG")
+            frame = Frame(self.image, source=self.url)
+        elif isinstance(image, Frame):
+            # A shared feed's frames go to every widget showing it, plugins get a
+            # copy of their own to change
+            frame = image.copy()
+            frame.mark("delivery")
+            self.display_delay = frame.age
         else:
-            self.image = image
+            frame = Frame(image, source=self.url)
+
+        frame = self.pipeline.run(frame)
+        frame.mark("plugins")
+        self.frame = frame
+        self.setDisplayImage(frame.image)
+        self.updateDecodeSize()
+        frame.mark("display")
+        self.stats.record(frame)
+
+    @property
+    def pipeline(self) -> FramePipeline:
+        """The plugins frames are passed through, see FramePipeline."""
+        if self._pipeline is None:
+            self._pipeline = FramePipeline(self.plugins.values())
+        return self._pipeline
+
+    def pluginsChanged(self) -> None:
+        """Rebuild the pipeline, after plugins were added or removed, or changed
+        whether they update the image."""
+        self._pipeline = FramePipeline(self.plugins.values(), previous=self._pipeline)
+        self.updateDecodeSize()
+
+    def pluginTimings(self) -> Dict[str, Dict[str, float]]:
+        """Seconds each plugin in the pipeline takes per frame, by plugin name.
+
+        Returns:
+            Dict[str, Dict[str, float]]: The "last" frame's, "mean" and "p99" of
+            recent frames, and the "count" of frames timed.
+        """
+        return self.pipeline.timings()
+
+    def frameStats(self) -> Dict[str, Dict[str, float]]:
+        """How the camera feed and this widget are keeping up, see FrameStats.snapshot.
+
+        Returns:
+            Dict[str, Dict[str, float]]: "source" has the stats of the frames the
+            camera's VideoThread decoded, "display" those of the frames shown here.
+        """
+        return {
+            "source": self.videoThread.stats.snapshot(),
+            "display": self.stats.snapshot(),
+        }
 
-        # Loop through plugins to process video image
-        for plugin in self.plugins.values():
-            if plugin.updates_image:
-                self.image = plugin.update_image_data(self.image)
+    def setDisplayImage(self, image: QImage) -> None:
+        """Show an image, scaled as set by `scale`.
 
-        if len(self.scale) == 2:
+        With scale_in_view the image is uploaded at full size and the pixmap item's
+        transform scales it as it is painted, otherwise it is resampled first.
+        """
+        factor = self.frameScale(image)
+        mode = Qt.SmoothTransformation if self.smooth_scaling else Qt.FastTransformation
+        if self.scale_in_view or factor == 1.0:
+            self.image = image
+            self._resample_factor = 1.0
+        else:
+            if len(self.scale) == 2 and self.scale[0] > 0:
+                self.image = image.scaledToWidth(self.scale[0], mode)
+            elif len(self.scale) == 2 and self.scale[1] > 0:
+                self.image = image.scaledToHeight(self.scale[1], mode)
+            else:
+                self.image = image.scaledToWidth(round(image.width() * factor), mode)
+            self._resample_factor = self.image.width() / max(image.width(), 1)
+            factor = 1.0
+        # self.view.setFixedSize(self.image.size())
+        # Only repaints the item, the view and scene are only laid out again when
+        # the size of the displayed frame changes
+        item = self.displayItem
+        if self.direct_paint:
+            self.imageItem.setImage(self.image)
+        else:
+            self.pixmap.setPixmap(QPixmap.fromImage(self.image))
+        item.setTransformationMode(mode)
+        item.setScale(factor)
+        self.pixmap.setVisible(not self.direct_paint)
+        self.imageItem.setVisible(self.direct_paint)
+        if self.displaySize() != self._display_size:
+            self.fitToFrame()
+
+    def frameScale(self, image: Optional[QImage] = None) -> float:
+        """The factor `scale` shrinks or enlarges a frame by for display.
+
+        Without a `scale` a frame decoded at reduced resolution, see decodeSize, is
+        enlarged back to the camera's resolution.
+        """
+        if image is None:
+            image = self.frame.image if self.frame else self.image
+        if len(self.scale) == 2 and not image.isNull():
             if self.scale[0] > 0:
-                self.image = self.image.scaledToWidth(self.scale[0])
+                return self.scale[0] / image.width()
             elif self.scale[1] > 0:
-                self.image = self.image.scaledToHeight(self.scale[1])
-
+                return self.scale[1] / image.height()
+        if self.frame is not None and image is self.frame.image:
+            return float(self.frame.reduction)
+        return 1.0
+
+    @property
+    def displayItem(self) -> "ImageItem|QGraphicsPixmapItem":
+        """The graphics item showing the frames."""
+        return self.imageItem if self.direct_paint else self.pixmap
+
+    def displaySize(self) -> QSize:
+        """Size of the frame as it is shown, in view pixels."""
+        return self.displayItem.sceneBoundingRect().size().toSize()
+
+    def mapToFrame(self, pos: "QPoint|QPointF") -> QPointF:
+        """Map a point in the view to a pixel of the frame on display.
+
+        Frame pixels are those of the image the plugins returned, before it is
+        scaled for display, so this works the same whichever way it is scaled.
+
+        Args:
+            pos: A position in the view's viewport, as mouse events give them.
+        """
+        if isinstance(pos, QPointF):
+            pos = pos.toPoint()
+        item_pos = self.displayItem.mapFromScene(self.view.mapToScene(pos))
+        return item_pos / self._resample_factor
+
+    def mapFromFrame(self, pos: "QPoint|QPointF") -> QPointF:
+        """Map a pixel of the frame on display to a point in the view, see mapToFrame."""
+        scene_pos = self.displayItem.mapToScene(
+            QPointF(pos) * self._resample_factor
+        )
+        return QPointF(self.view.mapFromScene(scene_pos))
+
+    def mapRectToFrame(self, rect: "QRect|QRectF") -> QRectF:
+        """Map a rectangle in the view to the frame on display, see mapToFrame."""
+        rect = QRectF(rect)
+        return QRectF(
+            self.mapToFrame(rect.topLeft()), self.mapToFrame(rect.bottomRight())
+        ).normalized()
+
+    def fitToFrame(self) -> None:
+        """Fit the widget, scene and view to the size of the displayed frame."""
+        self._display_size = size = self.displaySize()
         self.updatedImageSize()
-        # self.view.setFixedSize(self.image.size())
-        pixmap = QPixmap.fromImage(self.image)
-        self.pixmap.setPixmap(pixmap)
-        self.scene.setSceneRect(self.pixmap.boundingRect())
-        rect = self.image.rect()
-        ht = self.image.rect().height()
-        wd = self.image.rect().width()
-        rect.setHeight(ht + 2)
-        rect.setWidth(wd + 2)
-        self.view.setGeometry(rect)
+        self.scene.setSceneRect(self.displayItem.sceneBoundingRect())
+        self.view.setGeometry(QRect(0, 0, size.width() + 2, size.height() + 2))
         self.update()
 
-    def resizeImage(self):
+    def resizeEvent(self, a0) -> None:
+        super().resizeEvent(a0)
+        # The layout has moved the view, fit it to the frame again on the next one
+        self._display_size = None
+
+    def decodeSize(self) -> Optional[Tuple[int, int]]:
+        """The (width, height) frames are displayed at, for reduced decoding.
+
+        Only a `scale` setting shrinks the displayed frame, without one the frame
+        is shown at full resolution and None is returned. 0 means that dimension
+        follows the aspect ratio. A QoS tier's max_width caps the decoded width
+        only, the frame is enlarged again so the widget keeps its size. Plugins
+        that update the image (zooming, drawing, recording) work in frame pixels,
+        so they always get full resolution frames.
+        """
+        if self.pipeline.full_resolution:
+            return None
+        size: Optional[Tuple[int, int]] = None
         if len(self.scale) == 2:
             if self.scale[0] > 0:
-                self.image = self.image.scaledToWidth(self.scale[0])
+                size = (self.scale[0], 0)
             elif self.scale[1] > 0:
-                self.image = self.image.scaledToHeight(self.scale[1])
+                size = (0, self.scale[1])
+        if self.qos is not None and self.qos.max_width:
+            if size is None or size[0] > self.qos.max_width:
+                size = (self.qos.max_width, 0)
+        return size
+
+    def updateDecodeSize(self) -> None:
+        """Let the source know if the size frames are displayed at changed."""
+        size = self.decodeSize()
+        if self.source is not None and size != self._decode_size:
+            self._decode_size = size
+            self.source.set_target_size(self.mailbox, size)
+
+    def resizeImage(self):
+        """Show the current image at the size set by `scale`."""
+        image = self.frame.image if self.frame else self.image
+        if not image.isNull():
+            self.setDisplayImage(image)
 
     def readFromDict(self, settings: Dict[Any, Any]):
         """Read the settings from a Python dict."""
@@ -275,6 +610,11 @@ class Microscope(QWidget):
         self.xDivs = settings.value("xDivs", 5, type=int)
         self.yDivs = settings.value("yDivs", 5, type=int)
         self.color = settings.value("color", False, type=bool)
+        self.history_seconds = settings.value("historySeconds", 0.0, type=float)
+        self.scale_in_view = settings.value("scaleInView", True, type=bool)
+        self.smooth_scaling = settings.value("smoothScaling", True, type=bool)
+        self.direct_paint = settings.value("directPaint", True, type=bool)
+        self.hidden_fps = settings.value("hiddenFps", 0.0, type=float)
 
         for plugin in self.plugins.values():
             settings.beginGroup(plugin.name)
@@ -283,6 +623,7 @@ class Microscope(QWidget):
                 settings_values[key] = settings.value(key)
             plugin.read_settings(settings_values)
             settings.endGroup()
+        self.pluginsChanged()
 
         if settings.value("scaleW", -1, type=int) >= 0 and self.viewport:
             self.scale = [
@@ -313,6 +654,11 @@ class Microscope(QWidget):
             settings.setValue("xDivs", self.xDivs)
             settings.setValue("yDivs", self.yDivs)
             settings.setValue("color", self.color)
+            settings.setValue("historySeconds", self.history_seconds)
+            settings.setValue("scaleInView", self.scale_in_view)
+            settings.setValue("smoothScaling", self.smooth_scaling)
+            settings.setValue("directPaint", self.direct_paint)
+            settings.setValue("hiddenFps", self.hidden_fps)
             if len(self.scale) == 2:
                 print(f"Writing {settings_group} {self.scale}")
                 settings.setValue("scaleW", self.scale[0])
@@ -12,6 +12,9 @@ from qmicroscope.plugins.base_plugin import BasePlugin
 
 
 class PluginSettingsDialog(QDialog):
+    # Emitted after the plugins saved their settings
+    settingsApplied: Signal = Signal()
+
     def __init__(self, parent=None, plugins=None) -> None:
         super().__init__(parent)
         if plugins:
@@ -64,6 +67,7 @@ class PluginSettingsDialog(QDialog):
         for plugin, widget in self.plugin_groupboxes.items():
             if widget:
                 plugin.save_settings(widget)
+        self.settingsApplied.emit()
 
     def cancelClicked(self):
         self.reject()
@@ -2,6 +2,7 @@ from typing import Dict, Any, Optional, List
 from qtpy.QtGui import QMouseEvent, QImage, QKeyEvent
 from qtpy.QtWidgets import QGroupBox, QAction
 from typing import Protocol, runtime_checkable
+from qmicroscope.utils.frame import Frame
 
 
 @runtime_checkable
@@ -59,6 +60,8 @@ class BasePlugin:
     Attributes:
         name (str): Name of the plugin.
         updates_image (bool): Whether the plugin updates the microscope image.
+        keep_acquiring (bool): Whether the plugin needs every frame even while the
+            microscope can't be seen, e.g. while recording.
         parent: Parent widget of the plugin.
     """
 
@@ -71,6 +74,7 @@ class BasePlugin:
         """
         self.name = "Generic Plugin"
         self.updates_image = False
+        self.keep_acquiring = False
         self.parent = parent
 
     def context_menu_entry(self) -> List[QAction]:
@@ -94,6 +98,20 @@ class BasePlugin:
         """
         return image
 
+    def update_frame(self, frame: Frame) -> Frame:
+        """
+        Like update_image_data, but with the frame's acquisition timestamp, sequence
+        number, source and stage timings. Override this instead of update_image_data
+        if the plugin needs them. Only called if self.updates_image is set to True
+
+        Args:
+            frame: Frame instance, frame.image is the QImage
+        returns:
+            Frame instance
+        """
+        frame.image = self.update_image_data(frame.image)
+        return frame
+
     def mouse_press_event(self, event: QMouseEvent):
         pass
 
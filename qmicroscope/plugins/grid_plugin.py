@@ -8,9 +8,10 @@ from qtpy.QtWidgets import (
     QHBoxLayout,
     QSpinBox,
     QLabel,
+    QGraphicsPathItem,
 )
 from qtpy.QtCore import QPoint, Qt, QRect, QRectF
-from qtpy.QtGui import QColor, QPen
+from qtpy.QtGui import QColor, QPainterPath, QPen
 from qmicroscope.widgets.rubberband import ResizableRubberBand
 from qmicroscope.widgets.color_button import ColorButton
 from qmicroscope.plugins.base_plugin import BasePlugin
@@ -45,8 +46,9 @@ class GridPlugin(BasePlugin):
         self.end: QPoint = QPoint(1, 1)
         self.start_grid = False
         self._grid_color = QColor.fromRgb(0, 255, 0)
-        self._grid_items = []
-        self._grid = None
+        self._grid: Optional[QGraphicsPathItem] = None
+        # What the grid's path was built from, see paintBoxes
+        self._grid_key = None
         self.plugin_state = defaultdict(bool)
         self._x_divs = 5
         self._y_divs = 5
@@ -238,7 +240,7 @@ class GridPlugin(BasePlugin):
             if self._grid.scene() == scene:
                 scene.removeItem(self._grid)
                 self._grid = None
-                self._grid_items = []
+                self._grid_key = None
 
     def create_rubberband(self):
         """
@@ -254,9 +256,10 @@ class GridPlugin(BasePlugin):
 
     def paintBoxes(self, scene: QGraphicsScene) -> None:
         """
-        Paint the boxes of the grid onto the specified QGraphicsScene. Removes the old grid if it
-        exists, creates a new grid using the current rubberband object's position and settings,
-        and adds the new grid to the specified QGraphicsScene.
+        Paint the boxes of the grid onto the specified QGraphicsScene. The grid is a
+        single path item, its path is only rebuilt when the rectangle, the number of
+        divisions or the color changed, so dragging the selector stays smooth with
+        hundreds of divisions.
 
         Parameters:
             scene (QGraphicsScene): The QGraphicsScene onto which to paint the grid.
@@ -264,14 +267,33 @@ class GridPlugin(BasePlugin):
         Returns:
             None.
         """
-        self.remove_grid(scene)
-        rect = QRectF(self.start, self.end)
-        if self._grid_color:
-            brushColor = self._grid_color
-        else:
-            brushColor = QColor.fromRgb(0, 255, 0)
-        pen = QPen(brushColor)
-        self._grid_items.append(scene.addRect(rect, pen=pen))
+        if self._grid and self._grid.scene() is not scene:
+            old_scene = self._grid.scene()
+            if old_scene is not None:
+                self.remove_grid(old_scene)
+            else:
+                # Detached from its scene already
+                self._grid = None
+                self._grid_key = None
+        if not self._grid:
+            self._grid = QGraphicsPathItem()
+            self._grid_key = None
+            scene.addItem(self._grid)
+
+        color = self._grid_color if self._grid_color else QColor.fromRgb(0, 255, 0)
+        key = (
+            self.start.x(),
+            self.start.y(),
+            self.end.x(),
+            self.end.y(),
+            self._x_divs,
+            self._y_divs,
+            color.rgba(),
+        )
+        if key == self._grid_key:
+            return
+        self._grid_key = key
+
         # Now draw the lines for the boxes in the rectangle.
         x1 = self.start.x()
         y1 = self.start.y()
@@ -280,14 +302,16 @@ class GridPlugin(BasePlugin):
         inc_x = (x2 - x1) / self._x_divs
         inc_y = (y2 - y1) / self._y_divs
 
+        path = QPainterPath()
+        path.addRect(QRectF(self.start, self.end))
         for i in range(1, self._x_divs):
-            l = scene.addLine(int(x1 + i * inc_x), y1, int(x1 + i * inc_x), y2, pen=pen)
-            self._grid_items.append(l)
+            path.moveTo(int(x1 + i * inc_x), y1)
+            path.lineTo(int(x1 + i * inc_x), y2)
         for i in range(1, self._y_divs):
-            l = scene.addLine(x1, int(y1 + i * inc_y), x2, int(y1 + i * inc_y), pen=pen)
-            self._grid_items.append(l)
-
-        self._grid = scene.createItemGroup(self._grid_items)
+            path.moveTo(x1, int(y1 + i * inc_y))
+            path.lineTo(x2, int(y1 + i * inc_y))
+        self._grid.setPen(QPen(color))
+        self._grid.setPath(path)
 
     def add_settings(self, parent=None) -> Optional[QGroupBox]:
         """
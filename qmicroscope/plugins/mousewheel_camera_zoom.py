@@ -6,6 +6,8 @@ from typing import Any, Dict, Optional
 import typing
 from qmicroscope.widgets.rubberband import ResizableRubberBand
 from qmicroscope.plugins.base_plugin import BasePlugin
+from qmicroscope.utils.mailbox import FrameMailbox
+from qmicroscope.widgets.sources import source_registry
 
 if typing.TYPE_CHECKING:
     from qmicroscope.microscope import Microscope
@@ -17,12 +19,19 @@ class MouseWheelCameraZoomPlugin(BasePlugin):
         This plugin takes a number of camera feeds that represents
         different zoom levels and switches between them when a
         mousewheel is used    
+
+        While acquiring, the zoom levels either side of the current one are kept
+        connected at prewarm_fps, so switching to them shows their latest frame
+        straight away instead of waiting for a new connection.
         """
         super().__init__(parent)
         self.name = "Mousewheel camera zoom"
         self.parent = parent
         self.urls = []
         self.current_url_index = 0
+        self.prewarm_fps = 1
+        # Mailboxes subscribed to the neighbouring zoom levels, by URL
+        self._warm: Dict[str, FrameMailbox] = {}
     
     def context_menu_entry(self):
         actions = []
@@ -30,20 +39,79 @@ class MouseWheelCameraZoomPlugin(BasePlugin):
 
     def read_settings(self, settings: Dict[str, Any]):
         self.urls = settings.get("urls", [])
+        self.prewarm_fps = float(settings.get("prewarm_fps", 1))
 
     def write_settings(self) -> Dict[str, Any]:
-        return {"urls": self.urls}
+        return {"urls": self.urls, "prewarm_fps": self.prewarm_fps}
+
+    def start_plugin(self):
+        if self.parent.url in self.urls:
+            self.current_url_index = self.urls.index(self.parent.url)
+        self._update_warm()
+
+    def stop_plugin(self):
+        for url in list(self._warm):
+            self._cool(url, wait=True)
 
     def mouse_wheel_event(self, event: QMouseEvent):
         if len(self.urls) > 1:
             if event.angleDelta().y() > 0:
                 if self.current_url_index < len(self.urls) - 1:
-                    self.current_url_index += 1
-                    self.parent.videoThread.setUrl(self.urls[self.current_url_index])
+                    self.set_zoom_level(self.current_url_index + 1)
             else:
                 if self.current_url_index > 0:
-                    self.current_url_index -= 1
-                    self.parent.videoThread.setUrl(self.urls[self.current_url_index])
+                    self.set_zoom_level(self.current_url_index - 1)
+
+    def set_zoom_level(self, index: int):
+        """Switch the microscope to the feed of another zoom level."""
+        self.current_url_index = index
+        url = self.urls[index]
+        if self.parent.source is None:
+            return
+        # Warm up the new neighbours first, the level we are leaving is one of them
+        # so it keeps running
+        self._update_warm()
+        self.parent.setSource(url)
+        mailbox = self._warm.get(url)
+        if mailbox is not None:
+            frame = mailbox.take()
+            if frame is not None:
+                self.parent.mailbox.put(frame)
+            self._cool(url)
+
+    def _update_warm(self):
+        """Subscribe to the zoom levels either side of the current one."""
+        if self.parent.source is None:
+            return
+        current = self.urls[self.current_url_index] if self.urls else None
+        neighbours = {
+            self.urls[i]
+            for i in (self.current_url_index - 1, self.current_url_index + 1)
+            if 0 <= i < len(self.urls)
+        }
+        neighbours.discard(current)
+        for url in neighbours:
+            if url not in self._warm:
+                mailbox = FrameMailbox(self.parent)
+                source_registry.subscribe(
+                    url, mailbox, self.prewarm_fps, self.parent.engine
+                )
+                self._warm[url] = mailbox
+        for url in list(self._warm):
+            if url not in neighbours and url != current:
+                self._cool(url)
+
+    def _cool(self, url: str, wait: bool = False):
+        """Stop prewarming a zoom level.
+
+        Args:
+            url: The zoom level's URL.
+            wait: Whether to wait for its acquisition thread to finish. Not done
+                while zooming so the GUI isn't held up.
+        """
+        mailbox = self._warm.pop(url)
+        source_registry.source(url).unsubscribe(mailbox, wait)
+        mailbox.deleteLater()
             
             
     
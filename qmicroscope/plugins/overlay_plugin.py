@@ -0,0 +1,91 @@
+from typing import Any, Dict, List, TYPE_CHECKING
+
+from qtpy.QtCore import QPoint, QTimer
+from qtpy.QtGui import QBrush, QColor, QFont
+from qtpy.QtWidgets import QAction, QGraphicsItem, QGraphicsSimpleTextItem
+
+from qmicroscope.plugins.base_plugin import BasePlugin
+
+if TYPE_CHECKING:
+    from qmicroscope.microscope import Microscope
+
+
+class TextOverlayPlugin(BasePlugin):
+    """
+    A base class for plugins that show a few lines of text in the corner of the view.
+
+    The text is refreshed on a timer while the microscope acquires, not on every
+    frame, so showing it costs next to nothing. Subclasses implement overlay_text.
+
+    Attributes:
+        refresh_ms (int): Milliseconds between refreshes of the text.
+        _visible (bool): Whether the text is shown.
+        _text_item (QGraphicsSimpleTextItem): The text on the scene.
+    """
+
+    refresh_ms = 500
+
+    def __init__(self, parent: "Microscope") -> None:
+        super().__init__(parent)
+        self.name = "Text Overlay"
+        self._visible = True
+        self._text_item = QGraphicsSimpleTextItem()
+        font = QFont("monospace")
+        font.setStyleHint(QFont.Monospace)
+        font.setPixelSize(12)
+        self._text_item.setFont(font)
+        self._text_item.setBrush(QBrush(QColor.fromRgb(0, 255, 0)))
+        # Same size and place in the corner however the view is scaled
+        self._text_item.setFlag(QGraphicsItem.ItemIgnoresTransformations)
+        self._text_item.setZValue(10)
+        self._text_item.setVisible(False)
+        self.parent.scene.addItem(self._text_item)
+        self._timer = QTimer(self.parent)
+        self._timer.setInterval(self.refresh_ms)
+        self._timer.timeout.connect(self.refresh)
+
+    def overlay_text(self) -> str:
+        """
+        Returns the text to show, called on every refresh.
+
+        Returns:
+            str
+        """
+        return ""
+
+    def refresh(self) -> None:
+        """Update the text and keep it in the top left corner of the view."""
+        self._text_item.setText(self.overlay_text())
+        self._text_item.setPos(self.parent.view.mapToScene(QPoint(5, 5)))
+
+    def start_plugin(self):
+        if self._visible:
+            self.refresh()
+            self._timer.start()
+        self._text_item.setVisible(self._visible)
+
+    def stop_plugin(self):
+        self._timer.stop()
+        self._text_item.setVisible(False)
+
+    def context_menu_entry(self) -> List[QAction]:
+        visible_action = QAction(
+            "Visible", self.parent, checkable=True, checked=self._visible
+        )
+        visible_action.triggered.connect(self._toggle_visibility)
+        return [visible_action]
+
+    def _toggle_visibility(self, value: bool) -> None:
+        self._visible = value
+        if value:
+            self.start_plugin()
+        else:
+            self.stop_plugin()
+
+    def read_settings(self, settings: Dict[str, Any]):
+        self._visible = settings.get("visible", self._visible)
+        if isinstance(self._visible, str):
+            self._visible = self._visible.lower() == "true"
+
+    def write_settings(self) -> Dict[str, Any]:
+        return {"visible": self._visible}
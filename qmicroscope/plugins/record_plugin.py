@@ -14,6 +14,7 @@ from qtpy.QtGui import QImage, QPainter, QPen, QFont, QColor
 from qmicroscope.plugins.base_plugin import BasePlugin
 from qmicroscope.widgets.color_button import ColorButton
 from qmicroscope.utils import convert_str_bool
+from qmicroscope.utils.frame import Frame
 from qtpy.QtGui import QMouseEvent, QKeyEvent
 from qtpy.QtCore import QThread, Signal, QObject, Qt, QTimer
 import cv2 as cv
@@ -165,6 +166,7 @@ class RecordPlugin(QObject):
         number_of_files (int): The maximum number of files that can be stored in the output directory.
         video_recorder_thread (RecorderThread): The thread used for recording video.
         updates_image (bool): True if the image should be updated during recording, False otherwise.
+        keep_acquiring (bool): True while recording, so frames keep coming while the microscope is hidden.
         raw_image (bool): True if the raw image should be recorded, False if a pixmap should be recorded.
         timestamp (bool): True if the current time should be overlaid on the video, False otherwise.
         timestamp_color (QColor): The color of the timestamp.
@@ -191,6 +193,7 @@ class RecordPlugin(QObject):
         self.video_recorder_thread = RecorderThread()
         self.image_ready.connect(self.video_recorder_thread.handle_frame)
         self.updates_image = True
+        self.keep_acquiring = False
         self.raw_image = True
         self.timestamp = False
         self.timestamp_color = QColor.fromRgb(0, 255, 0)
@@ -203,7 +206,7 @@ class RecordPlugin(QObject):
         self.stop_record_action = QAction("Stop Record", self.parent())
         self.stop_record_action.triggered.connect(lambda: self._set_record(False))
 
-    def qimage_to_mat(self, qimage: QImage):
+    def qimage_to_mat(self, qimage: QImage, acquired: Optional[datetime] = None):
         qimage = qimage.convertToFormat(QImage.Format.Format_ARGB32)
         qimage = qimage.scaledToWidth(self.width)
         self.height = qimage.height()
@@ -215,7 +218,7 @@ class RecordPlugin(QObject):
             p.drawText(
                 qimage.rect(),
                 Qt.AlignHCenter,
-                f'{datetime.now().strftime("%b-%d-%Y %H:%M:%S")}',
+                f'{(acquired or datetime.now()).strftime("%b-%d-%Y %H:%M:%S")}',
             )
             p.end()
 
@@ -234,12 +237,26 @@ class RecordPlugin(QObject):
         arr = cv.cvtColor(image_array, cv.COLOR_RGBA2BGR)
         self.image_ready.emit(arr)
 
-    def update_image_data(self, image: QImage):
+    def update_frame(self, frame: Frame) -> Frame:
+        """
+        Records the frame, timestamped with when it was acquired rather than when it
+        reached the widget.
+
+        Args:
+            frame: The frame to record.
+        """
+        frame.image = self.update_image_data(
+            frame.image, datetime.fromtimestamp(frame.wall_time)
+        )
+        return frame
+
+    def update_image_data(self, image: QImage, acquired: Optional[datetime] = None):
         """
         Updates the recorded image data.
 
         Args:
             image: The image to record.
+            acquired: When the image was acquired, defaults to now.
         """
         if self.recording and image:
             if (datetime.now() - self.start_time).seconds >= 3600 * self.hours_per_file:
@@ -254,7 +271,7 @@ class RecordPlugin(QObject):
                 pixmap = self.parent().grab()
                 recorded_image = pixmap.toImage().convertToFormat(QImage.Format_RGB888)
 
-            self.qimage_to_mat(recorded_image)
+            self.qimage_to_mat(recorded_image, acquired)
 
         return image
 
@@ -286,10 +303,17 @@ class RecordPlugin(QObject):
                 actions.append(self.start_record_action)
         return actions
 
+    def _keep_acquiring(self, value: bool):
+        """Record every frame even while the microscope is hidden or minimised."""
+        self.keep_acquiring = value
+        if self.parent() is not None:
+            self.parent().updateAcquisitionRate()
+
     def _set_record(self, start):
         if start and not self.recording:
             print("Starting record in _set_record")
             self.recording = True
+            self._keep_acquiring(True)
             self.start_time = datetime.now()
             self.current_filepath = Path(self.filename.parent) / Path(
                 f'{self.filename.stem}_{self.start_time.strftime("%b-%d-%Y_%H%M%S")}.{self.file_extension}'
@@ -305,6 +329,7 @@ class RecordPlugin(QObject):
         elif not start and self.recording:
             print("Stopping record in _set_record")
             self.recording = False
+            self._keep_acquiring(False)
             if not self.current_filepath:
                 return
             self.video_recorder_thread.stop()
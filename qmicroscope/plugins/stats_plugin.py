@@ -0,0 +1,39 @@
+from typing import TYPE_CHECKING
+
+from qmicroscope.plugins.overlay_plugin import TextOverlayPlugin
+
+if TYPE_CHECKING:
+    from qmicroscope.microscope import Microscope
+
+
+class StatsPlugin(TextOverlayPlugin):
+    """
+    An overlay showing how well the camera feed is keeping up.
+
+    Shows the frame rate and latency of the camera's decoded frames and of the ones
+    this widget displays, the time spent fetching, decoding and in the plugins, and
+    the frames dropped on the way, see Microscope.frameStats.
+    """
+
+    def __init__(self, parent: "Microscope") -> None:
+        super().__init__(parent)
+        self.name = "Frame Stats"
+
+    def overlay_text(self) -> str:
+        stats = self.parent.frameStats()
+        source, display = stats["source"], stats["display"]
+        return "\n".join(
+            [
+                f"camera  {source['fps']:5.1f} fps  "
+                f"latency {source['latency'] * 1000:6.1f} ms  "
+                f"fetch {source.get('fetch', 0.0) * 1000:5.1f} ms  "
+                f"decode {source.get('decode', 0.0) * 1000:5.1f} ms",
+                f"display {display['fps']:5.1f} fps  "
+                f"latency {display['latency'] * 1000:6.1f} ms  "
+                f"p99 {display['latency_p99'] * 1000:6.1f} ms  "
+                f"plugins {display.get('plugins', 0.0) * 1000:5.1f} ms",
+                f"dropped {source['skipped']} decoding, "
+                f"{display['skipped']} displaying, "
+                f"{source['unchanged']} unchanged",
+            ]
+        )
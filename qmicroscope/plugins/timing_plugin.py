@@ -0,0 +1,33 @@
+from typing import TYPE_CHECKING
+
+from qmicroscope.plugins.overlay_plugin import TextOverlayPlugin
+
+if TYPE_CHECKING:
+    from qmicroscope.microscope import Microscope
+
+
+class PluginTimingPlugin(TextOverlayPlugin):
+    """
+    A debug overlay showing how long each plugin in the frame pipeline takes.
+
+    Lists the plugins that transform frames, with the milliseconds they took on the
+    last frame, their mean and 99th percentile over recent frames, see
+    Microscope.pluginTimings.
+    """
+
+    def __init__(self, parent: "Microscope") -> None:
+        super().__init__(parent)
+        self.name = "Plugin Timing"
+
+    def overlay_text(self) -> str:
+        timings = self.parent.pluginTimings()
+        if not timings:
+            return "No plugins process frames"
+        width = max(len(name) for name in timings)
+        lines = [f"{'plugin':<{width}}   last   mean    p99 (ms)"]
+        for name, stats in timings.items():
+            lines.append(
+                f"{name:<{width}} {stats['last'] * 1000:6.2f} "
+                f"{stats['mean'] * 1000:6.2f} {stats['p99'] * 1000:6.2f}"
+            )
+        return "\n".join(lines)
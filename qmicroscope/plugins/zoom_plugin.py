@@ -17,16 +17,18 @@ class ZoomPlugin(BaseImagePlugin):
         self.crop = None
 
     def _crop_image(self) -> None:
-        if self.zoomRubberBand:
-            width_scaling_factor = self.org_image_wd / self.parent.image.width()
-            ht_scaling_factor = self.org_image_ht / self.parent.image.height()
+        if self.zoomRubberBand and self.parent.frame:
+            # The selection in the frame on display, which may already be cropped
+            frame_image = self.parent.frame.image
+            width_scaling_factor = self.org_image_wd / frame_image.width()
+            ht_scaling_factor = self.org_image_ht / frame_image.height()
 
             (
                 rect_x,
                 rect_y,
                 rect_width,
                 rect_ht,
-            ) = self.zoomRubberBand.geometry().getRect()
+            ) = self.parent.mapRectToFrame(self.zoomRubberBand.geometry()).getRect()
             x = int(rect_x * width_scaling_factor)
             y = int(rect_y * ht_scaling_factor)
             wd = int(rect_width * width_scaling_factor)
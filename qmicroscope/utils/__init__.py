@@ -1,2 +1,12 @@
 from .settings import *
 from .recorder import *
+from .mjpeg import *
+from .arrays import *
+from .frame import *
+from .decoder import *
+from .history import *
+from .mailbox import *
+from .scheduler import *
+from .rolling import *
+from .pipeline import *
+from .stats import *
@@ -0,0 +1,48 @@
+import cv2
+import numpy as np
+from qtpy.QtGui import QImage
+
+# Qt 5.14 and later can use OpenCV's BGR channel order as it is
+_FORMAT_BGR888 = getattr(QImage, "Format_BGR888", None)
+
+
+def array_to_qimage(array: np.ndarray) -> QImage:
+    """Wrap an OpenCV image in a QImage without copying its pixels.
+
+    The QImage reads the array's memory and keeps a reference to the array in its
+    `ndarray` attribute, so the pixels stay valid for as long as the QImage does.
+    The wrap is zero-copy for reading only: painting on the QImage makes Qt copy
+    the pixels first, so it paints on a private copy and the array is unchanged.
+
+    Args:
+        array (np.ndarray): A uint8 grayscale (height, width) or BGR
+            (height, width, 3) image, as returned by cv2. On Qt older than 5.14 a
+            BGR array is copied to RGB, leaving the array as it was.
+
+    Returns:
+        QImage: The image, sharing its pixels with the array unless they had to be
+            copied.
+    """
+    if array.dtype != np.uint8:
+        raise ValueError(f"Expected a uint8 image, got {array.dtype}")
+    if array.ndim == 3 and array.shape[2] == 1:
+        array = array[:, :, 0]
+    if array.ndim == 2:
+        image_format = QImage.Format_Grayscale8
+    elif array.ndim == 3 and array.shape[2] == 3:
+        image_format = _FORMAT_BGR888
+    else:
+        raise ValueError(f"Expected a grayscale or BGR image, got {array.shape}")
+
+    if not array.flags.c_contiguous:
+        # Only views that skip columns or channels get here
+        array = np.ascontiguousarray(array)
+    if image_format is None:
+        # Not in place, the caller may still use the array, e.g. FrameHistory
+        array = cv2.cvtColor(array, cv2.COLOR_BGR2RGB)
+        image_format = QImage.Format_RGB888
+
+    height, width = array.shape[:2]
+    image = QImage(array.data, width, height, array.strides[0], image_format)
+    image.ndarray = array
+    return image
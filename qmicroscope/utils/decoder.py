@@ -0,0 +1,213 @@
+import itertools
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Optional, Tuple
+
+import cv2
+import numpy as np
+from qtpy.QtGui import QImage
+
+from qmicroscope.utils.arrays import array_to_qimage
+from qmicroscope.utils.frame import Frame
+
+
+# imdecode flags for decoding a JPEG at 1/2, 1/4 and 1/8 scale in the DCT domain
+_REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def reduction_factor(
+    full_size: Optional[Tuple[int, int]], target_size: Optional[Tuple[int, int]]
+) -> int:
+    """Pick the largest reduced decode that is still at least the target size.
+
+    Args:
+        full_size: (width, height) of the image at full resolution, if known.
+        target_size: (width, height) the image is displayed at. 0 leaves that
+            dimension unconstrained, None means full resolution is needed.
+
+    Returns:
+        int: 1, 2, 4 or 8.
+    """
+    if not full_size or not target_size:
+        return 1
+    full_width, full_height = full_size
+    target_width, target_height = target_size
+    for factor in (8, 4, 2):
+        if (
+            full_width // factor >= target_width
+            and full_height // factor >= target_height
+        ):
+            return factor
+    return 1
+
+
+def decode_jpeg(data: bytes, reduction: int = 1) -> QImage:
+    """Decode JPEG (or any other format OpenCV reads) bytes into a QImage.
+
+    cv2 releases the GIL while decoding, so several of these can run in parallel
+    on the DecodePool. The QImage wraps the decoded pixels without copying them.
+
+    Args:
+        data (bytes): The encoded image.
+        reduction (int): Decode at 1/2, 1/4 or 1/8 of the full resolution, which
+            for JPEG is done by skipping DCT coefficients and is much faster.
+
+    Returns:
+        QImage: The decoded image, null if the data could not be decoded.
+    """
+    frame = cv2.imdecode(
+        np.frombuffer(data, dtype=np.uint8), _REDUCED_FLAGS[reduction]
+    )
+    if frame is None:
+        # Let Qt have a go at anything OpenCV doesn't understand
+        return QImage.fromData(data)
+    return array_to_qimage(frame)
+
+
+class DecodePool:
+    """A thread pool shared by every camera for decoding frames off the GUI thread.
+
+    Args:
+        max_workers (Optional[int]): Number of decode threads, defaults to the number
+            of cores (at most 8).
+    """
+
+    _instance: "Optional[DecodePool]" = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        if max_workers is None:
+            max_workers = min(8, os.cpu_count() or 1)
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="qmicroscope-decode"
+        )
+
+    @classmethod
+    def instance(cls) -> "DecodePool":
+        """Return the process-wide pool, creating it on first use."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        return self.executor.submit(fn, *args, **kwargs)
+
+
+class FrameDecoder:
+    """Decodes the frames of one camera on the shared DecodePool.
+
+    Frames are decoded in parallel but handed to the callback in the order they were
+    submitted. If the pool falls behind, frames that have not started decoding yet are
+    dropped in favour of newer ones. Every submitted frame is numbered, so dropped ones
+    leave a gap in Frame.sequence.
+
+    Args:
+        callback (Callable[[Frame], None]): Called with every decoded frame, from
+            whichever thread finished it.
+        pool (Optional[DecodePool]): Pool to decode on, defaults to the shared pool.
+        max_pending (int): Maximum number of frames queued or decoding at once.
+
+    Attributes:
+        target_size (Optional[Tuple[int, int]]): (width, height) the frames are
+            displayed at, see `reduction_factor`. Frames are decoded at the smallest
+            reduced resolution that still covers it.
+        full_size (Optional[Tuple[int, int]]): Full resolution of the last frame.
+        reduction (int): Reduction the last frame was decoded with.
+        dropped (int): Frames dropped because too many were pending.
+        errors (int): Frames whose decoding raised an exception.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[Frame], None],
+        pool: Optional[DecodePool] = None,
+        max_pending: int = 2,
+    ) -> None:
+        self.callback = callback
+        self.pool = pool if pool else DecodePool.instance()
+        self.max_pending = max_pending
+        self.target_size: Optional[Tuple[int, int]] = None
+        self.full_size: Optional[Tuple[int, int]] = None
+        self.reduction = 1
+        self.dropped = 0
+        self.errors = 0
+        self._sequence = itertools.count(1)
+        self._pending: Deque[Future] = deque()
+        # Re-entrant, cancelling a future runs _done() from inside submit()
+        self._lock = threading.RLock()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def submit(self, data: bytes, frame: Optional[Frame] = None) -> None:
+        """Queue encoded image data for decoding.
+
+        Args:
+            data (bytes): The encoded image.
+            frame (Optional[Frame]): The frame the data belongs to, its image is set
+                once decoded. Defaults to a frame acquired now.
+        """
+        if frame is None:
+            frame = Frame()
+        with self._lock:
+            frame.sequence = next(self._sequence)
+            if len(self._pending) >= self.max_pending and not self._drop_oldest():
+                self.dropped += 1
+                return
+            future = self.pool.submit(self._decode, data, frame)
+            self._pending.append(future)
+        future.add_done_callback(self._done)
+
+    def submit_image(self, image: QImage, frame: Optional[Frame] = None) -> None:
+        """Deliver an image that is already decoded, in order with pending frames."""
+        if frame is None:
+            frame = Frame()
+        frame.image = image
+        future: Future = Future()
+        future.set_result(frame)
+        with self._lock:
+            frame.sequence = next(self._sequence)
+            self._pending.append(future)
+        future.add_done_callback(self._done)
+
+    def _decode(self, data: bytes, frame: Frame) -> Frame:
+        frame.mark("queue")
+        reduction = reduction_factor(self.full_size, self.target_size)
+        image = decode_jpeg(data, reduction)
+        if not image.isNull():
+            self.full_size = (image.width() * reduction, image.height() * reduction)
+            self.reduction = reduction
+        frame.image = image
+        frame.reduction = reduction
+        frame.mark("decode")
+        return frame
+
+    def _drop_oldest(self) -> bool:
+        for future in self._pending:
+            if future.cancel():
+                self.dropped += 1
+                return True
+        return False
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            while self._pending and self._pending[0].done():
+                finished = self._pending.popleft()
+                if finished.cancelled():
+                    continue
+                try:
+                    frame = finished.result()
+                except Exception:
+                    self.errors += 1
+                    continue
+                self.callback(frame)
@@ -0,0 +1,94 @@
+import time
+from typing import Dict, Optional
+
+from qtpy.QtGui import QImage
+
+
+class Frame:
+    """A camera frame, with where and when it was acquired.
+
+    Frames are created by the acquisition thread, numbered and filled in by its
+    FrameDecoder, and handed through the Microscope's plugins. A gap in `sequence`
+    means frames were dropped on the way.
+
+    Args:
+        image (Optional[QImage]): The pixels, set once the frame is decoded.
+        timestamp (Optional[float]): time.monotonic() when the frame was acquired,
+            defaults to now.
+        source (str): URL of the camera.
+
+    Attributes:
+        sequence (int): Number of the frame in its feed, set by the FrameDecoder.
+        reduction (int): The image was decoded at 1/reduction of the camera's
+            resolution, set by the FrameDecoder.
+        timings (Dict[str, float]): Seconds spent in each stage of the pipeline, e.g.
+            "fetch", "queue", "decode", "delivery", "plugins" and "display".
+        marked (float): time.monotonic() when the last timed stage ended.
+    """
+
+    __slots__ = (
+        "image",
+        "timestamp",
+        "sequence",
+        "reduction",
+        "source",
+        "timings",
+        "marked",
+    )
+
+    def __init__(
+        self,
+        image: Optional[QImage] = None,
+        timestamp: Optional[float] = None,
+        source: str = "",
+    ) -> None:
+        self.image = image
+        self.timestamp = time.monotonic() if timestamp is None else timestamp
+        self.sequence = 0
+        self.reduction = 1
+        self.source = source
+        self.timings: Dict[str, float] = {}
+        self.marked = self.timestamp
+
+    def __repr__(self) -> str:
+        return (
+            f"Frame(source={self.source!r}, sequence={self.sequence}, "
+            f"age={self.age:.3f})"
+        )
+
+    @property
+    def age(self) -> float:
+        """Seconds since the frame was acquired."""
+        return time.monotonic() - self.timestamp
+
+    @property
+    def wall_time(self) -> float:
+        """time.time() when the frame was acquired, for timestamping recordings."""
+        return time.time() - self.age
+
+    def time_stage(self, stage: str, started: float) -> float:
+        """Record how long a stage took.
+
+        Args:
+            stage (str): Name of the stage.
+            started (float): time.monotonic() when the stage started.
+
+        Returns:
+            float: time.monotonic() now, to start timing the next stage.
+        """
+        now = self.marked = time.monotonic()
+        self.timings[stage] = now - started
+        return now
+
+    def mark(self, stage: str) -> float:
+        """Record how long a stage took, if it started when the last one ended."""
+        return self.time_stage(stage, self.marked)
+
+    def copy(self) -> "Frame":
+        """A shallow copy, for a widget to change the image without affecting others."""
+        frame = Frame(self.image, self.timestamp, self.source)
+        frame.sequence = self.sequence
+        frame.reduction = self.reduction
+        frame.timings = dict(self.timings)
+        frame.marked = self.marked
+        return frame
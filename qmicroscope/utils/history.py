@@ -0,0 +1,181 @@
+import bisect
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from qmicroscope.utils.arrays import array_to_qimage
+from qmicroscope.utils.decoder import decode_jpeg
+from qmicroscope.utils.frame import Frame
+
+# An encoded JPEG, or a BGR array from cv2.VideoCapture
+FrameData = Union[bytes, np.ndarray]
+
+
+class FrameHistory:
+    """The last few seconds of a camera's frames, looked up by acquisition time.
+
+    Frames are kept as they arrive, JPEG bytes or the arrays cv2.VideoCapture returns,
+    without copying them, and only decoded when they are asked for. The oldest
+    frames are dropped once they are more than `seconds` older than the newest one,
+    or the frames take more than `max_bytes`.
+
+    Timestamps are time.monotonic(), like Frame.timestamp.
+
+    Args:
+        seconds (float): How much history to keep.
+        max_bytes (int): Memory budget for the kept frames.
+        source (str): URL of the camera, for the frames handed out.
+    """
+
+    def __init__(
+        self, seconds: float = 10.0, max_bytes: int = 256 * 2**20, source: str = ""
+    ) -> None:
+        self.seconds = seconds
+        self.max_bytes = max_bytes
+        self.source = source
+        self.nbytes = 0
+        # Lists rather than deques so lookups can bisect them. Dropped frames are
+        # skipped by moving _head, and the lists compacted once that is half of them.
+        self._timestamps: List[float] = []
+        self._data: List[Optional[FrameData]] = []
+        self._head = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._timestamps) - self._head
+
+    @property
+    def span(self) -> Tuple[float, float]:
+        """Timestamps of the oldest and newest frame, (0, 0) if empty."""
+        with self._lock:
+            if len(self._timestamps) == self._head:
+                return (0.0, 0.0)
+            return (self._timestamps[self._head], self._timestamps[-1])
+
+    def append(self, timestamp: float, data: FrameData) -> None:
+        """Add the newest frame, dropping the ones that no longer fit."""
+        with self._lock:
+            if len(self._timestamps) > self._head and timestamp < self._timestamps[-1]:
+                # Out of order frames would break the lookups
+                return
+            self._timestamps.append(timestamp)
+            self._data.append(data)
+            self.nbytes += _size(data)
+            oldest = timestamp - self.seconds
+            while self._head < len(self._timestamps) and (
+                self._timestamps[self._head] < oldest or self.nbytes > self.max_bytes
+            ):
+                self.nbytes -= _size(self._data[self._head])
+                self._data[self._head] = None
+                self._head += 1
+            if self._head > len(self._timestamps) // 2:
+                del self._timestamps[: self._head]
+                del self._data[: self._head]
+                self._head = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._timestamps.clear()
+            self._data.clear()
+            self._head = 0
+            self.nbytes = 0
+
+    def frame_at(self, timestamp: float) -> Optional[Frame]:
+        """The frame that was showing at a time, None if it is older than the history.
+
+        Args:
+            timestamp (float): time.monotonic() of interest.
+        """
+        with self._lock:
+            index = bisect.bisect_right(self._timestamps, timestamp, self._head) - 1
+            if index < self._head:
+                return None
+            entry = (self._timestamps[index], self._data[index])
+        return self._to_frame(*entry)
+
+    def frame_ago(self, seconds: float) -> Optional[Frame]:
+        """The frame that was showing a number of seconds ago."""
+        return self.frame_at(time.monotonic() - seconds)
+
+    def entries_between(
+        self, start: float, end: float
+    ) -> List[Tuple[float, FrameData]]:
+        """The timestamps and undecoded data of the frames acquired from start to end."""
+        with self._lock:
+            first = bisect.bisect_left(self._timestamps, start, self._head)
+            last = bisect.bisect_right(self._timestamps, end, self._head)
+            return [
+                (self._timestamps[i], self._data[i]) for i in range(first, last)
+            ]
+
+    def frames_between(self, start: float, end: float) -> List[Frame]:
+        """The decoded frames acquired from start to end."""
+        return [self._to_frame(*entry) for entry in self.entries_between(start, end)]
+
+    def export(self, path: Union[str, Path], start: float, end: float) -> int:
+        """Save the frames acquired from start to end.
+
+        Args:
+            path: A .mp4 or .avi file to write a video to, at the frame rate the
+                frames arrived at. Anything else is a directory JPEG files are
+                written to, named by acquisition time in milliseconds.
+            start (float): time.monotonic() of the first frame.
+            end (float): time.monotonic() of the last frame.
+
+        Returns:
+            int: The number of frames written.
+        """
+        path = Path(path)
+        entries = self.entries_between(start, end)
+        if not entries:
+            return 0
+        if path.suffix.lower() in (".mp4", ".avi"):
+            return self._export_video(path, entries)
+
+        path.mkdir(parents=True, exist_ok=True)
+        # Name the files by wall clock time, so they can be matched to other logs
+        offset = time.time() - time.monotonic()
+        for timestamp, data in entries:
+            if isinstance(data, np.ndarray):
+                data = cv2.imencode(".jpg", data)[1].tobytes()
+            (path / f"{int((timestamp + offset) * 1000)}.jpg").write_bytes(data)
+        return len(entries)
+
+    def _export_video(
+        self, path: Path, entries: List[Tuple[float, FrameData]]
+    ) -> int:
+        duration = entries[-1][0] - entries[0][0]
+        fps = (len(entries) - 1) / duration if duration > 0 else 1.0
+        fourcc = cv2.VideoWriter_fourcc(*("mp4v" if path.suffix == ".mp4" else "MJPG"))
+        writer: Optional[cv2.VideoWriter] = None
+        written = 0
+        try:
+            for _, data in entries:
+                if not isinstance(data, np.ndarray):
+                    data = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), 1)
+                    if data is None:
+                        continue
+                if writer is None:
+                    height, width = data.shape[:2]
+                    writer = cv2.VideoWriter(str(path), fourcc, fps, (width, height))
+                writer.write(data)
+                written += 1
+        finally:
+            if writer is not None:
+                writer.release()
+        return written
+
+    def _to_frame(self, timestamp: float, data: FrameData) -> Frame:
+        if isinstance(data, np.ndarray):
+            image = array_to_qimage(data)
+        else:
+            image = decode_jpeg(data)
+        return Frame(image, timestamp, self.source)
+
+
+def _size(data: FrameData) -> int:
+    return data.nbytes if isinstance(data, np.ndarray) else len(data)
@@ -0,0 +1,49 @@
+import threading
+from typing import Any, Optional
+
+from qtpy.QtCore import QObject, Signal
+
+
+class FrameMailbox(QObject):
+    """A single-slot, latest-frame-wins hand-off between acquisition and display.
+
+    `put` may be called from any thread and overwrites a frame that is still waiting
+    to be displayed. frameReady is only emitted when the slot goes from empty to full,
+    so at most one frame and one queued notification are waiting for the GUI thread
+    no matter how far it falls behind.
+
+    Attributes:
+        delivered (int): Frames taken out of the mailbox.
+        dropped (int): Frames overwritten before they were taken.
+    """
+
+    frameReady = Signal()
+
+    def __init__(self, parent: "QObject|None" = None) -> None:
+        super().__init__(parent)
+        self.delivered = 0
+        self.dropped = 0
+        self._frame: Any = None
+        self._lock = threading.Lock()
+
+    def put(self, frame: Any) -> None:
+        """Store a frame, replacing the one waiting to be taken if there is one."""
+        with self._lock:
+            was_empty = self._frame is None
+            if not was_empty:
+                self.dropped += 1
+            self._frame = frame
+        if was_empty:
+            self.frameReady.emit()
+
+    def take(self) -> Optional[Any]:
+        """Remove and return the waiting frame, or None if the slot is empty."""
+        with self._lock:
+            frame, self._frame = self._frame, None
+            if frame is not None:
+                self.delivered += 1
+        return frame
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frame = None
@@ -0,0 +1,151 @@
+import re
+from typing import Dict, List, Optional
+
+_BOUNDARY_RE = re.compile(r'boundary="?([^";]+)"?', re.IGNORECASE)
+
+
+def boundary_from_content_type(content_type: str) -> Optional[bytes]:
+    """Extract the multipart boundary from a Content-Type header.
+
+    Args:
+        content_type (str): Value of the Content-Type header.
+
+    Returns:
+        Optional[bytes]: The boundary, or None if this is not a multipart
+        x-mixed-replace content type.
+    """
+    if not content_type.lower().startswith("multipart/x-mixed-replace"):
+        return None
+    match = _BOUNDARY_RE.search(content_type)
+    if not match:
+        return None
+    boundary = match.group(1).strip().encode("latin-1")
+    # Some cameras (Axis among them) include the leading dashes in the parameter
+    if boundary.startswith(b"--"):
+        boundary = boundary[2:]
+    return boundary
+
+
+class MultipartParser:
+    """Incremental parser for multipart/x-mixed-replace (MJPEG) streams.
+
+    Chunks of any size read from the response are passed to `feed`, which returns
+    the payloads of the parts completed by that chunk. Parts with a Content-Length
+    header are sliced out directly, otherwise the payload runs until the next
+    boundary.
+
+    Args:
+        boundary (bytes): Boundary from the response's Content-Type header.
+        max_part_size (int): Data is discarded if no part completes within this
+            many bytes, so a broken stream cannot grow the buffer without bound.
+
+    Attributes:
+        parts (int): Number of parts returned so far.
+        discarded (int): Number of bytes thrown away while resynchronising.
+    """
+
+    def __init__(self, boundary: bytes, max_part_size: int = 32 * 1024 * 1024):
+        self.delimiter = b"--" + boundary
+        self.max_part_size = max_part_size
+        self.parts = 0
+        self.discarded = 0
+        self._buffer = bytearray()
+        self._state = "boundary"
+        self._length: Optional[int] = None
+        self.headers: Dict[str, str] = {}
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """Add data read from the stream.
+
+        Args:
+            data (bytes): The next chunk of the response body.
+
+        Returns:
+            List[bytes]: Payloads of the parts completed by this chunk, oldest first.
+        """
+        self._buffer += data
+        payloads = []
+        while True:
+            if self._state == "boundary":
+                if not self._read_boundary():
+                    break
+            elif self._state == "headers":
+                if not self._read_headers():
+                    break
+            else:
+                payload = self._read_body()
+                if payload is None:
+                    break
+                self.parts += 1
+                payloads.append(payload)
+
+        if len(self._buffer) > self.max_part_size:
+            self.discarded += len(self._buffer)
+            self._buffer.clear()
+            self._state = "boundary"
+        return payloads
+
+    def _read_boundary(self) -> bool:
+        index = self._buffer.find(self.delimiter)
+        if index < 0:
+            # Keep enough of the tail to match a delimiter split across chunks
+            keep = len(self.delimiter) - 1
+            if len(self._buffer) > keep:
+                self.discarded += len(self._buffer) - keep
+                del self._buffer[:-keep]
+            return False
+        line_end = self._buffer.find(b"\n", index)
+        if line_end < 0:
+            return False
+        self.discarded += index
+        del self._buffer[: line_end + 1]
+        self._state = "headers"
+        return True
+
+    def _read_headers(self) -> bool:
+        if self._buffer.startswith(b"\r\n") or self._buffer.startswith(b"\n"):
+            # A part without any headers
+            end, header_block = self._buffer.find(b"\n") + 1, b""
+        else:
+            end = self._buffer.find(b"\r\n\r\n")
+            if end >= 0:
+                header_block, end = bytes(self._buffer[:end]), end + 4
+            else:
+                end = self._buffer.find(b"\n\n")
+                if end < 0:
+                    return False
+                header_block, end = bytes(self._buffer[:end]), end + 2
+        del self._buffer[:end]
+
+        self.headers = {}
+        for line in header_block.decode("latin-1").splitlines():
+            name, sep, value = line.partition(":")
+            if sep:
+                self.headers[name.strip().lower()] = value.strip()
+        try:
+            self._length = int(self.headers["content-length"])
+        except (KeyError, ValueError):
+            self._length = None
+        self._state = "body"
+        return True
+
+    def _read_body(self) -> Optional[bytes]:
+        if self._length is not None:
+            if len(self._buffer) < self._length:
+                return None
+            end = self._length
+            next_start = end
+        else:
+            end = self._buffer.find(self.delimiter)
+            if end < 0:
+                return None
+            next_start = end
+            # The CRLF before the delimiter belongs to the boundary
+            if self._buffer[end - 2 : end] == b"\r\n":
+                end -= 2
+            elif self._buffer[end - 1 : end] == b"\n":
+                end -= 1
+        payload = bytes(self._buffer[:end])
+        del self._buffer[:next_start]
+        self._state = "boundary"
+        return payload
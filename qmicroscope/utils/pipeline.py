@@ -0,0 +1,114 @@
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional
+
+from qmicroscope.utils.frame import Frame
+from qmicroscope.utils.rolling import RollingWindow
+
+if TYPE_CHECKING:
+    from qmicroscope.plugins.base_plugin import BasePlugin
+
+
+class PipelineStage:
+    """A plugin in a FramePipeline, with how long it takes on each frame.
+
+    Args:
+        name (str): Name of the plugin.
+        process (Callable[[Frame], Frame]): What the plugin does to a frame.
+        timing (Optional[RollingWindow]): Seconds the plugin took on recent frames,
+            carried over when the pipeline is rebuilt.
+    """
+
+    __slots__ = ("name", "process", "timing")
+
+    def __init__(
+        self,
+        name: str,
+        process: Callable[[Frame], Frame],
+        timing: Optional[RollingWindow] = None,
+    ) -> None:
+        self.name = name
+        self.process = process
+        self.timing = timing if timing is not None else RollingWindow()
+
+    def stats(self) -> Dict[str, float]:
+        """Seconds taken on the last frame, mean and 99th percentile of recent ones."""
+        return {
+            "last": self.timing.last,
+            "mean": self.timing.mean,
+            "p99": self.timing.percentile(99),
+            "count": self.timing.count,
+        }
+
+
+class FramePipeline:
+    """The plugins that transform a Microscope's frames, in order.
+
+    Built once from the plugins rather than checked on every frame. Plugins with
+    `updates_image` unset are left out, as are the ones that don't override
+    update_frame or update_image_data, since they would hand the frame back as is.
+
+    Args:
+        plugins (Iterable[BasePlugin]): The Microscope's plugins, in order.
+        previous (Optional[FramePipeline]): The pipeline this one replaces, the
+            timings of plugins still in the pipeline are kept.
+    """
+
+    def __init__(
+        self,
+        plugins: "Iterable[BasePlugin]",
+        previous: "Optional[FramePipeline]" = None,
+    ) -> None:
+        from qmicroscope.plugins.base_plugin import BasePlugin
+
+        timings = {}
+        if previous is not None:
+            timings = {stage.name: stage.timing for stage in previous.stages}
+
+        self.stages: List[PipelineStage] = []
+        # Plugins that update the image work in frame pixels, see Microscope.decodeSize
+        self.full_resolution = False
+        for plugin in plugins:
+            if not plugin.updates_image:
+                continue
+            self.full_resolution = True
+            if hasattr(plugin, "update_frame"):
+                if (
+                    type(plugin).update_frame is BasePlugin.update_frame
+                    and type(plugin).update_image_data is BasePlugin.update_image_data
+                ):
+                    continue
+                process = plugin.update_frame
+            else:
+                process = _image_stage(plugin)
+            self.stages.append(
+                PipelineStage(plugin.name, process, timings.get(plugin.name))
+            )
+
+    def __len__(self) -> int:
+        return len(self.stages)
+
+    def __iter__(self) -> Iterator[PipelineStage]:
+        return iter(self.stages)
+
+    def run(self, frame: Frame) -> Frame:
+        """Pass a frame through every stage, timing each of them."""
+        started = time.perf_counter()
+        for stage in self.stages:
+            frame = stage.process(frame)
+            ended = time.perf_counter()
+            stage.timing.add(ended - started)
+            started = ended
+        return frame
+
+    def timings(self) -> Dict[str, Dict[str, float]]:
+        """The stats of every stage by plugin name, see PipelineStage.stats."""
+        return {stage.name: stage.stats() for stage in self.stages}
+
+
+def _image_stage(plugin: "BasePlugin") -> Callable[[Frame], Frame]:
+    # Plugins that only implement the SupportsBasePlugin protocol work on QImages
+    def process(frame: Frame) -> Frame:
+        frame.image = plugin.update_image_data(frame.image)
+        return frame
+
+    return process
@@ -0,0 +1,62 @@
+import numpy as np
+
+
+class RollingWindow:
+    """The last `size` values of a measurement, in a fixed buffer.
+
+    Adding a value overwrites the oldest one in place, so a measurement taken on
+    every frame costs no allocations. Statistics are computed when asked for.
+
+    Args:
+        size (int): Number of values kept.
+    """
+
+    def __init__(self, size: int = 256) -> None:
+        self._values = np.zeros(size, dtype=np.float64)
+        self._index = 0
+        self.count = 0  # Values added since the last reset, not only the kept ones
+        self.last = 0.0
+
+    def __len__(self) -> int:
+        return min(self.count, len(self._values))
+
+    def add(self, value: float) -> None:
+        self._values[self._index] = value
+        self._index = (self._index + 1) % len(self._values)
+        self.count += 1
+        self.last = value
+
+    def reset(self) -> None:
+        self._index = 0
+        self.count = 0
+        self.last = 0.0
+
+    @property
+    def oldest(self) -> float:
+        """The oldest value kept."""
+        if self.count < len(self._values):
+            return float(self._values[0])
+        return float(self._values[self._index])
+
+    def values(self) -> np.ndarray:
+        """The kept values, oldest first."""
+        if self.count < len(self._values):
+            return self._values[: self.count].copy()
+        return np.roll(self._values, -self._index)
+
+    @property
+    def mean(self) -> float:
+        if not len(self):
+            return 0.0
+        return float(self._values[: len(self)].mean())
+
+    @property
+    def max(self) -> float:
+        if not len(self):
+            return 0.0
+        return float(self._values[: len(self)].max())
+
+    def percentile(self, q: float) -> float:
+        if not len(self):
+            return 0.0
+        return float(np.percentile(self._values[: len(self)], q))
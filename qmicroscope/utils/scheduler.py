@@ -0,0 +1,77 @@
+import time
+from collections import deque
+from typing import Callable, Deque
+
+
+class FrameScheduler:
+    """Paces acquisition to a target frame rate using absolute deadlines.
+
+    Each frame slot has a deadline one period after the previous one, so the time
+    spent fetching a frame is taken out of the wait instead of being added to it. If
+    a fetch overruns, the slots that have already passed are skipped rather than
+    fetched back to back to catch up.
+
+    Args:
+        fps (float): Target frame rate.
+        clock (Callable[[], float]): Monotonic clock in seconds.
+        window (int): Number of frames the achieved frame rate is averaged over.
+
+    Attributes:
+        skipped (int): Frame slots skipped because a fetch overran.
+    """
+
+    def __init__(
+        self,
+        fps: float = 5,
+        clock: Callable[[], float] = time.monotonic,
+        window: int = 30,
+    ) -> None:
+        self.clock = clock
+        self.period = 1.0
+        self.set_fps(fps)
+        self.skipped = 0
+        self.deadline = self.clock()
+        self._frame_times: Deque[float] = deque(maxlen=window)
+
+    def set_fps(self, fps: float) -> None:
+        self.period = 1.0 / max(fps, 0.001)
+
+    @property
+    def target_fps(self) -> float:
+        return 1.0 / self.period
+
+    @property
+    def achieved_fps(self) -> float:
+        """Frame rate over the last `window` frames."""
+        if len(self._frame_times) < 2:
+            return 0.0
+        elapsed = self._frame_times[-1] - self._frame_times[0]
+        return (len(self._frame_times) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def start(self) -> None:
+        """Make the first frame due now and forget previous statistics."""
+        self.deadline = self.clock()
+        self.skipped = 0
+        self._frame_times.clear()
+
+    def resync(self) -> None:
+        """Make the next frame due now, after a period the scheduler wasn't pacing."""
+        self.deadline = self.clock()
+
+    def count_frame(self) -> None:
+        """Record that a frame was delivered, for the achieved frame rate."""
+        self._frame_times.append(self.clock())
+
+    def next_frame(self) -> float:
+        """Move on to the next frame slot.
+
+        Returns:
+            float: Seconds to wait until the next frame is due.
+        """
+        now = self.clock()
+        self.deadline += self.period
+        if now > self.deadline:
+            missed = int((now - self.deadline) / self.period) + 1
+            self.skipped += missed
+            self.deadline += missed * self.period
+        return self.deadline - now
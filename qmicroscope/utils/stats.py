@@ -0,0 +1,109 @@
+import threading
+import time
+from typing import Dict
+
+from qmicroscope.utils.frame import Frame
+from qmicroscope.utils.rolling import RollingWindow
+
+
+class FrameStats:
+    """Frame rate, latency and stage timings of the frames passing a point.
+
+    A VideoThread records its frames as they come out of the decoder, a Microscope
+    as it displays them, so the same numbers describe the camera feed and what each
+    widget makes of it. Every measurement goes into a fixed RollingWindow, recording
+    a frame allocates nothing once a stage has been seen.
+
+    May be fed from any thread.
+
+    Args:
+        window (int): Number of recent frames the rates and timings cover.
+
+    Attributes:
+        frames (int): Frames recorded.
+        skipped (int): Frames missing from the sequence, dropped before reaching
+            this point. For a widget this includes frames throttled to its fps.
+        unchanged (int): Frames the camera sent again without changing them.
+        latency (RollingWindow): Seconds from acquisition to this point.
+        stages (Dict[str, RollingWindow]): Seconds spent in each pipeline stage, see
+            Frame.timings.
+    """
+
+    # Seconds without a frame after which the feed counts as stalled
+    stall_seconds = 2.0
+
+    def __init__(self, window: int = 120) -> None:
+        self.window = window
+        self.frames = 0
+        self.skipped = 0
+        self.unchanged = 0
+        self.latency = RollingWindow(window)
+        self.stages: Dict[str, RollingWindow] = {}
+        self._arrivals = RollingWindow(window)
+        self._last_sequence = 0
+        self._lock = threading.Lock()
+
+    def record(self, frame: Frame) -> None:
+        """Count a frame that reached this point."""
+        now = time.monotonic()
+        with self._lock:
+            self.frames += 1
+            self._arrivals.add(now)
+            self.latency.add(now - frame.timestamp)
+            for stage, seconds in frame.timings.items():
+                window = self.stages.get(stage)
+                if window is None:
+                    window = self.stages[stage] = RollingWindow(self.window)
+                window.add(seconds)
+            if frame.sequence:
+                if self._last_sequence and frame.sequence > self._last_sequence:
+                    self.skipped += frame.sequence - self._last_sequence - 1
+                self._last_sequence = frame.sequence
+
+    def record_unchanged(self) -> None:
+        """Count a frame that was identical to the last one, so wasn't passed on."""
+        with self._lock:
+            self.unchanged += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.frames = self.skipped = self.unchanged = 0
+            self.latency.reset()
+            self._arrivals.reset()
+            for window in self.stages.values():
+                window.reset()
+            self._last_sequence = 0
+
+    @property
+    def fps(self) -> float:
+        """Frames per second over the window, 0 if the feed has stalled."""
+        with self._lock:
+            count = len(self._arrivals)
+            if count < 2:
+                return 0.0
+            if time.monotonic() - self._arrivals.last > self.stall_seconds:
+                return 0.0
+            duration = self._arrivals.last - self._arrivals.oldest
+        return (count - 1) / duration if duration > 0 else 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        """The current numbers, for monitoring.
+
+        Returns:
+            Dict[str, float]: "fps", the "frames", "skipped" and "unchanged"
+            counts, the mean "latency" and its "latency_p99" in seconds, and the
+            mean seconds spent in each stage, by stage name.
+        """
+        fps = self.fps
+        with self._lock:
+            stats = {
+                "fps": fps,
+                "frames": self.frames,
+                "skipped": self.skipped,
+                "unchanged": self.unchanged,
+                "latency": self.latency.mean,
+                "latency_p99": self.latency.percentile(99),
+            }
+            for stage, window in self.stages.items():
+                stats[stage] = window.mean
+        return stats
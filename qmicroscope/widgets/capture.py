@@ -0,0 +1,131 @@
+import threading
+import time
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+
+class CaptureReader:
+    """Reads a cv2.VideoCapture feed on a thread of its own, always at the newest frame.
+
+    OpenCV buffers frames a camera pushes faster than they are read, so reading one
+    frame per display period shows frames that are seconds old. The reader instead
+    calls grab() as fast as the camera delivers, which drains the buffer without
+    decoding anything, and only decodes the frame grabbed after `request` with
+    retrieve().
+
+    A video file has no newest frame and would be drained at decoding speed, so
+    it is read one frame per `request` instead, starting over at the end.
+
+    Args:
+        url: The feed to open with cv2.VideoCapture.
+        on_frame: Called from the reader thread with each retrieved BGR frame and
+            time.monotonic() when it was grabbed.
+        live: Whether the feed is a live camera rather than a file, None to tell
+            from whether it reports a frame count.
+
+    Attributes:
+        grabbed (int): Frames grabbed from the camera or file.
+        retrieved (int): Frames decoded and handed to on_frame.
+        error (Optional[str]): Why the reader stopped, if it failed.
+    """
+
+    # Consecutive failed grabs before the feed is considered lost
+    max_failures = 50
+
+    def __init__(
+        self,
+        url: str,
+        on_frame: Callable[[np.ndarray, float], None],
+        live: Optional[bool] = None,
+    ) -> None:
+        self.url = url
+        self.on_frame = on_frame
+        self.live = live
+        self.grabbed = 0
+        self.retrieved = 0
+        self.error: Optional[str] = None
+        self._wanted = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="qmicroscope-capture", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Ask the reader to stop, it exits once the grab in progress returns."""
+        self._stop.set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for the reader thread to exit."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def request(self) -> None:
+        """Decode the next grabbed frame and hand it to on_frame."""
+        self._wanted.set()
+
+    def _run(self) -> None:
+        capture = cv2.VideoCapture(self.url)
+        try:
+            if not capture.isOpened():
+                self.error = f"could not open {self.url}"
+                return
+            if self.live is None:
+                # Live feeds report 0 or -1 frames
+                self.live = capture.get(cv2.CAP_PROP_FRAME_COUNT) <= 0
+            if self.live:
+                self._drain(capture)
+            else:
+                self._play(capture)
+        finally:
+            capture.release()
+
+    def _drain(self, capture: cv2.VideoCapture) -> None:
+        """Grab a live feed as fast as it comes, retrieving the requested frames."""
+        # Only honoured by some backends, the grab loop drains the rest
+        capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        failures = 0
+        while not self._stop.is_set():
+            if not capture.grab():
+                failures += 1
+                if failures >= self.max_failures:
+                    self.error = f"lost {self.url}"
+                    return
+                time.sleep(0.01)
+                continue
+            failures = 0
+            grabbed_at = time.monotonic()
+            self.grabbed += 1
+            if self._wanted.is_set():
+                self._wanted.clear()
+                self._retrieve(capture, grabbed_at)
+
+    def _play(self, capture: cv2.VideoCapture) -> None:
+        """Read a file one frame per request, so it plays at the requested rate."""
+        while not self._stop.is_set():
+            if not self._wanted.wait(0.1):
+                continue
+            self._wanted.clear()
+            if not capture.grab():
+                # The end of the file, start over
+                capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                if not capture.grab():
+                    self.error = f"could not read {self.url}"
+                    return
+            self.grabbed += 1
+            self._retrieve(capture, time.monotonic())
+
+    def _retrieve(self, capture: cv2.VideoCapture, grabbed_at: float) -> None:
+        ok, frame = capture.retrieve()
+        if ok and frame is not None:
+            self.retrieved += 1
+            self.on_frame(frame, grabbed_at)
@@ -0,0 +1,60 @@
+import time
+from typing import TYPE_CHECKING, Dict
+
+from qtpy.QtCore import QObject, QTimer
+
+if TYPE_CHECKING:
+    from qmicroscope.microscope import Microscope
+
+
+class DisplayScheduler(QObject):
+    """Shows the frames waiting for a group of Microscopes in one pass per display tick.
+
+    A Microscope with a scheduler doesn't take its frame as soon as its mailbox fills,
+    it asks the scheduler to. At most `max_hz` times a second the scheduler has every
+    Microscope that is waiting take its newest frame, run its plugins and update its
+    view, so their repaints land in the same paint pass. Cameras faster than the cap
+    only cost the GUI thread the frames that can be seen, leaving time for mouse
+    interaction with the overlay plugins.
+
+    Args:
+        max_hz (float): Maximum display passes per second, 0 for no cap.
+        parent (Optional[QObject]): Parent object.
+
+    Attributes:
+        ticks (int): Display passes run.
+        frames (int): Frames shown in them.
+    """
+
+    def __init__(self, max_hz: float = 30.0, parent: "QObject|None" = None) -> None:
+        super().__init__(parent)
+        self.max_hz = max_hz
+        self.ticks = 0
+        self.frames = 0
+        self._pending: "Dict[Microscope, None]" = {}
+        self._last_tick = 0.0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._tick)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def schedule(self, microscope: "Microscope") -> None:
+        """Have a Microscope take its waiting frame on the next display tick."""
+        self._pending[microscope] = None
+        if not self._timer.isActive():
+            delay = 0.0
+            if self.max_hz > 0:
+                delay = self._last_tick + 1.0 / self.max_hz - time.monotonic()
+            self._timer.start(max(0, int(delay * 1000)))
+
+    def _tick(self) -> None:
+        self._last_tick = time.monotonic()
+        pending = list(self._pending)
+        self._pending.clear()
+        self.ticks += 1
+        for microscope in pending:
+            microscope.takeFrame()
+            self.frames += 1
@@ -1,15 +1,413 @@
+import base64
+import hashlib
+import http.client
+import socket
+import threading
 import time
+from collections import defaultdict
 from qtpy.QtCore import Signal, QByteArray, QObject, QUrl, QThread, Qt, QRect, QRectF
 from qtpy.QtGui import QImage, QPainter, QBrush, QPen, QPixmap
 from qtpy.QtNetwork import QNetworkReply, QNetworkRequest, QNetworkAccessManager
-from typing import List, Any, Dict, Optional, NamedTuple
+from typing import List, Any, Dict, Optional, NamedTuple, Set, Tuple
 from cv2 import VideoCapture
-import urllib.request
+import numpy as np
+import urllib.error
+from urllib.parse import urlsplit
 from io import BytesIO
 from PIL import Image, ImageQt, ImageFile
+from qmicroscope.utils.arrays import array_to_qimage
+from qmicroscope.utils.decoder import FrameDecoder
+from qmicroscope.utils.frame import Frame
+from qmicroscope.utils.history import FrameHistory
+from qmicroscope.utils.mjpeg import MultipartParser, boundary_from_content_type
+from qmicroscope.utils.scheduler import FrameScheduler
+from qmicroscope.utils.stats import FrameStats
+from qmicroscope.widgets.capture import CaptureReader
 
 ImageFile.LOAD_TRUNCATED_IMAGES = True
 
+# Errors raised when a server has silently dropped an idle keep-alive connection
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+class FetchResult(NamedTuple):
+    status: int
+    headers: http.client.HTTPMessage
+    body: bytes
+
+
+class Stream(NamedTuple):
+    conn: http.client.HTTPConnection
+    response: http.client.HTTPResponse
+    sock: socket.socket
+
+
+def _set_deadline(sock: socket.socket, deadline: float) -> None:
+    """Time out the next socket operation when the deadline passes."""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("deadline passed before the response arrived")
+    sock.settimeout(remaining)
+
+
+def split_url(
+    url: str, headers: Optional[Dict[str, str]] = None
+) -> Tuple[Tuple[str, str, int], str, Dict[str, str]]:
+    """Split a camera URL into what's needed to send a keep-alive GET request.
+
+    Args:
+        url: The camera URL, optionally with user:password@ for basic auth.
+        headers: Extra request headers.
+
+    Returns:
+        The (scheme, host, port) key connections are pooled by, the request target
+        and the request headers.
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https"):
+        raise urllib.error.URLError(f"unsupported scheme {scheme!r}")
+    default_port = 443 if scheme == "https" else 80
+    key = (scheme, parts.hostname or "localhost", parts.port or default_port)
+    target = parts.path or "/"
+    if parts.query:
+        target = f"{target}?{parts.query}"
+    request_headers = {"Connection": "keep-alive"}
+    if parts.username:
+        credentials = f"{parts.username}:{parts.password or ''}".encode()
+        request_headers["Authorization"] = (
+            f"Basic {base64.b64encode(credentials).decode()}"
+        )
+    if headers:
+        request_headers.update(headers)
+    return key, target, request_headers
+
+
+def _read_body(
+    response: http.client.HTTPResponse, sock: socket.socket, deadline: float
+) -> bytes:
+    """Read a response body in chunks, giving up once the deadline passes."""
+    chunks = []
+    while not response.isclosed():
+        _set_deadline(sock, deadline)
+        chunk = response.read(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _abort_socket(sock: socket.socket) -> None:
+    """Wake up any thread blocked on the socket."""
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class FetchStats:
+    """Counters for the HTTP fetches made for a single camera URL.
+
+    Attributes:
+        requests (int): Number of completed requests.
+        reused (int): Requests served over an already open keep-alive connection.
+        opened (int): New TCP connections opened for this camera.
+        errors (int): Requests that raised instead of returning a response.
+        last_latency (float): Duration of the last request in seconds.
+        total_latency (float): Sum of all request durations in seconds.
+    """
+
+    __slots__ = (
+        "requests",
+        "reused",
+        "opened",
+        "errors",
+        "last_latency",
+        "total_latency",
+    )
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.reused = 0
+        self.opened = 0
+        self.errors = 0
+        self.last_latency = 0.0
+        self.total_latency = 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.requests if self.requests else 0.0
+
+    @property
+    def reuse_ratio(self) -> float:
+        return self.reused / self.requests if self.requests else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "reused": self.reused,
+            "opened": self.opened,
+            "errors": self.errors,
+            "last_latency": self.last_latency,
+            "mean_latency": self.mean_latency,
+        }
+
+
+class ConnectionPool:
+    """Keep-alive HTTP client shared by all of the cameras in the process.
+
+    Idle connections are kept per (scheme, host, port), so polling a JPEG endpoint
+    reuses the same TCP connection instead of paying a handshake and DNS lookup for
+    every frame. Statistics are kept per camera URL.
+
+    Args:
+        max_idle: Maximum number of idle connections kept open per host.
+    """
+
+    def __init__(self, max_idle: int = 4) -> None:
+        self.max_idle = max_idle
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = (
+            defaultdict(list)
+        )
+        self._stats: Dict[str, FetchStats] = defaultdict(FetchStats)
+        self._in_flight: Dict[str, Set[socket.socket]] = defaultdict(set)
+        # Bumped by cancel(), so a cancelled request is not retried
+        self._generation: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def stats(self, url: str) -> FetchStats:
+        """Return the fetch counters for a camera URL."""
+        with self._lock:
+            return self._stats[url]
+
+    def fetch(
+        self, url: str, timeout: float = 5.0, headers: Optional[Dict[str, str]] = None
+    ) -> FetchResult:
+        """GET a URL over a pooled connection and read the whole body.
+
+        Args:
+            url: The URL to request.
+            timeout: Seconds the whole request may take, from connecting to reading
+                the last byte of the body. A late response is abandoned and its
+                connection closed.
+            headers: Extra request headers.
+
+        Raises:
+            urllib.error.HTTPError: The server answered with an error status.
+            TimeoutError: The response did not arrive before the deadline.
+            OSError: The connection failed or the request was cancelled.
+        """
+        key, target, request_headers = split_url(url, headers)
+        stats = self.stats(url)
+        start = time.perf_counter()
+        deadline = time.monotonic() + timeout
+        generation = self._generation[url]
+        while True:
+            # Connecting counts against the deadline too, as does a retry
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                with self._lock:
+                    stats.errors += 1
+                raise TimeoutError("deadline passed before the request was sent")
+            conn, reused = self._acquire(key, remaining)
+            sock = None
+            try:
+                conn.request("GET", target, headers=request_headers)
+                sock = conn.sock
+                self._track(url, sock)
+                _set_deadline(sock, deadline)
+                response = conn.getresponse()
+                body = _read_body(response, sock, deadline)
+            except Exception as e:
+                conn.close()
+                if (
+                    reused
+                    and isinstance(e, _STALE_CONNECTION_ERRORS)
+                    and generation == self._generation[url]
+                    and time.monotonic() < deadline
+                ):
+                    # The server closed the idle connection, retry on a new one
+                    continue
+                with self._lock:
+                    stats.errors += 1
+                raise
+            finally:
+                self._untrack(url, sock)
+            break
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+
+        latency = time.perf_counter() - start
+        with self._lock:
+            stats.requests += 1
+            stats.last_latency = latency
+            stats.total_latency += latency
+            if reused:
+                stats.reused += 1
+            else:
+                stats.opened += 1
+
+        if response.status >= 400:
+            raise urllib.error.HTTPError(
+                url, response.status, response.reason, response.headers, None
+            )
+        return FetchResult(response.status, response.headers, body)
+
+    def open_stream(
+        self, url: str, timeout: float = 5.0, headers: Optional[Dict[str, str]] = None
+    ) -> "Stream":
+        """GET a URL on a dedicated connection and return once the headers arrive.
+
+        Used for long-lived responses such as MJPEG streams, and to sniff the
+        Content-Type of a new feed. The caller owns the connection and closes it.
+
+        Args:
+            url: The URL to request.
+            timeout: Seconds to wait for the headers, and for each later read.
+            headers: Extra request headers.
+
+        Raises:
+            urllib.error.HTTPError: The server answered with an error status.
+            OSError: The connection failed or timed out.
+        """
+        key, target, request_headers = split_url(url, headers)
+        stats = self.stats(url)
+        start = time.perf_counter()
+        deadline = time.monotonic() + timeout
+        scheme, host, port = key
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(host, port, timeout=timeout)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        sock = None
+        try:
+            conn.request("GET", target, headers=request_headers)
+            sock = conn.sock
+            self._track(url, sock)
+            _set_deadline(sock, deadline)
+            response = conn.getresponse()
+            sock.settimeout(timeout)
+        except Exception:
+            conn.close()
+            with self._lock:
+                stats.errors += 1
+            raise
+        finally:
+            self._untrack(url, sock)
+
+        latency = time.perf_counter() - start
+        with self._lock:
+            stats.requests += 1
+            stats.opened += 1
+            stats.last_latency = latency
+            stats.total_latency += latency
+
+        if response.status >= 400:
+            conn.close()
+            raise urllib.error.HTTPError(
+                url, response.status, response.reason, response.headers, None
+            )
+        return Stream(conn, response, sock)
+
+    def cancel(self, url: str) -> None:
+        """Abort every request for a URL that is still in flight.
+
+        Safe to call from any thread. The threads blocked in `fetch` or
+        `open_stream` for the URL get an OSError straight away.
+        """
+        with self._lock:
+            self._generation[url] += 1
+            sockets = list(self._in_flight.get(url, ()))
+        for sock in sockets:
+            _abort_socket(sock)
+
+    def clear(self) -> None:
+        """Close every idle connection."""
+        with self._lock:
+            connections = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for conn in connections:
+            conn.close()
+
+    def _track(self, url: str, sock: Optional[socket.socket]) -> None:
+        if sock is not None:
+            with self._lock:
+                self._in_flight[url].add(sock)
+
+    def _untrack(self, url: str, sock: Optional[socket.socket]) -> None:
+        if sock is not None:
+            with self._lock:
+                self._in_flight[url].discard(sock)
+
+    def _acquire(
+        self, key: Tuple[str, str, int], timeout: float
+    ) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            conn = idle.pop() if idle else None
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+
+        scheme, host, port = key
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(host, port, timeout=timeout)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        return conn, False
+
+    def _release(
+        self, key: Tuple[str, str, int], conn: http.client.HTTPConnection
+    ) -> None:
+        with self._lock:
+            idle = self._idle[key]
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+
+# Process-wide pool used by every VideoThread
+connection_pool = ConnectionPool()
+
+
+# How a feed is acquired, decided from the Content-Type of the first response
+MODE_JPEG = "jpeg"  # Poll a single JPEG image per frame
+MODE_MJPEG = "mjpeg"  # Parse a multipart/x-mixed-replace stream ourselves
+MODE_CAPTURE = "capture"  # Anything else (RTSP, files, ...) goes to cv2.VideoCapture
+
+
+def feed_mode(url: str, content_type: Optional[str] = None) -> Optional[str]:
+    """Work out how to acquire a feed.
+
+    Args:
+        url: The camera URL.
+        content_type: Content-Type of the response, if the URL has been requested.
+
+    Returns:
+        One of the MODE_* constants, or None if the URL has to be requested first.
+    """
+    if urlsplit(url).scheme.lower() not in ("http", "https"):
+        return MODE_CAPTURE
+    if content_type is None:
+        return None
+    content_type = content_type.lower()
+    if content_type.startswith("multipart/x-mixed-replace"):
+        return MODE_MJPEG
+    if content_type.startswith("image/"):
+        return MODE_JPEG
+    return MODE_CAPTURE
+
 
 class Downloader(QObject):
     imageReady = Signal(object)
@@ -22,125 +420,451 @@ class Downloader(QObject):
         self.request.setUrl(QUrl(self.url))
         self.buffer = QByteArray()
         self.reply: Optional[QNetworkReply] = None
-        self.isMjpegFeed = False
+        self.parser: Optional[MultipartParser] = None
+        self.mjpegCamera: Optional[VideoCapture] = None
+        self.decoder = FrameDecoder(self.imageReady.emit)
 
     def setUrl(self, url: str) -> None:
         self.url = url
         self.request.setUrl(QUrl(self.url))
-        if self.url.lower().endswith("mjpg") or self.url.lower().endswith("cgi"):
-            self.isMjpegFeed = True
+        if self.reply:
+            self.reply.abort()
+        if feed_mode(self.url) == MODE_CAPTURE:
             self.mjpegCamera = VideoCapture(self.url)
         else:
-            self.isMjpegFeed = False
             self.mjpegCamera = None
 
     def downloadData(self) -> None:
         """Only request a new image if this is the first/last completed."""
-        if self.reply is None and not self.isMjpegFeed:
+        if self.mjpegCamera:
+            retVal, currentFrame = self.mjpegCamera.read()
+            if currentFrame is not None:
+                image = array_to_qimage(currentFrame)
+                self.decoder.submit_image(image, Frame(source=self.url))
+        elif self.reply is None:
+            self.parser = None
             self.reply = self.manager.get(self.request)
+            self.reply.metaDataChanged.connect(self.metaDataChanged)
+            self.reply.readyRead.connect(self.readyRead)
             self.reply.finished.connect(self.finished)
-        elif self.isMjpegFeed:
-            if self.mjpegCamera:
-                retVal, currentFrame = self.mjpegCamera.read()
-                if currentFrame is not None:
-                    height, width = currentFrame.shape[:2]
-                    image = QImage(
-                        currentFrame, width, height, 3 * width, QImage.Format_RGB888
-                    )
-                    self.imageReady.emit(image.rgbSwapped())
+
+    def metaDataChanged(self) -> None:
+        """Switch to streaming if the reply is an MJPEG stream."""
+        if self.reply:
+            content_type = self.reply.header(QNetworkRequest.ContentTypeHeader)
+            if feed_mode(self.url, content_type or "") == MODE_MJPEG:
+                self.parser = MultipartParser(boundary_from_content_type(content_type))
+
+    def readyRead(self) -> None:
+        """Emit every JPEG completed by the data that arrived on an MJPEG stream."""
+        if self.reply and self.parser:
+            payloads = self.parser.feed(bytes(self.reply.readAll()))
+            if payloads:
+                self.decoder.submit(payloads[-1], Frame(source=self.url))
 
     def finished(self) -> None:
         """Read the buffer, emit a signal with the new image in it."""
         if self.reply:
-            self.buffer = self.reply.readAll()
-            self.imageReady.emit(self.buffer)
+            if not self.parser:
+                self.buffer = self.reply.readAll()
+                self.decoder.submit(bytes(self.buffer), Frame(source=self.url))
             self.reply.deleteLater()
             self.reply = None
+            self.parser = None
 
 
 class VideoThread(QThread):
     imageReady = Signal(object)
+    # A fetch returned the same image as the last one, so nothing was emitted
+    frameUnchanged = Signal()
 
     def camera_refresh(self):
-        """Only request a new image if this is the first/last completed."""
-        if not self.isMjpegFeed:
-            try:
-                data = urllib.request.urlopen(self.url, timeout=1000 / self.fps).read()
-                qimage = QImage.fromData(data)
-                self.showing_error = False
-                self.imageReady.emit(qimage)
-            except urllib.error.URLError:
-                qimage = self.draw_message(f"URLError: {self.url}")
-                self.imageReady.emit(qimage)
-            except TimeoutError:
-                qimage = self.draw_message(f"Timeout Error: {self.url}")
-                self.imageReady.emit(qimage)
-            except OSError as e:
-                qimage = self.draw_message(f"OSError {e}: {self.url}")
-                self.imageReady.emit(qimage)
-            except Exception as e:
-                qimage = self.draw_message(f"Exception {e}: {self.url}")
-                self.imageReady.emit(qimage)
+        """Fetch the next frame, working out the kind of feed on the first call."""
+        if self.mode == MODE_CAPTURE:
+            self.capture_refresh()
+            return
 
-        elif self.isMjpegFeed and self.mjpegCamera:
-            retVal, currentFrame = self.mjpegCamera.read()
-            if currentFrame is not None:
-                height, width = currentFrame.shape[:2]
-                image = QImage(
-                    currentFrame, width, height, 3 * width, QImage.Format_RGB888
+        try:
+            if self.mode is None:
+                self.open_feed()
+            elif self.mode == MODE_MJPEG:
+                self.stream_refresh()
+            else:
+                started = time.monotonic()
+                result = self.pool.fetch(
+                    self.url, timeout=self.fetch_timeout, headers=self.validators
                 )
-                self.imageReady.emit(image.rgbSwapped())
-                # self.imageReady.emit(currentFrame)
+                if result.status == 304:
+                    self.frame_unchanged()
+                else:
+                    self.update_validators(result.headers)
+                    self.emit_jpeg(result.body, started=started)
+        except urllib.error.URLError:
+            self.show_error(f"URLError: {self.url}")
+        except TimeoutError:
+            self.show_error(f"Timeout Error: {self.url}")
+        except OSError as e:
+            self.show_error(f"OSError {e}: {self.url}")
+        except Exception as e:
+            self.show_error(f"Exception {e}: {self.url}")
+
+    def open_feed(self):
+        """Request the URL and pick the acquisition mode from its Content-Type."""
+        self.close_stream()
+        url = self.url
+        started = time.monotonic()
+        deadline = started + self.fetch_timeout
+        stream = self.pool.open_stream(url, timeout=self.fetch_timeout)
+        content_type = stream.response.getheader("Content-Type", "")
+        mode = feed_mode(url, content_type)
+        if mode == MODE_MJPEG:
+            self.parser = MultipartParser(boundary_from_content_type(content_type))
+            # The camera sets the pace of a stream, so only give up on it once it
+            # has been silent for stream_timeout
+            stream.sock.settimeout(max(self.stream_timeout, self.fetch_timeout))
+            self.stream = stream
+        elif mode == MODE_JPEG:
+            try:
+                data = _read_body(stream.response, stream.sock, deadline)
+            finally:
+                stream.conn.close()
+            self.update_validators(stream.response.headers)
+            self.emit_jpeg(data, started=started)
+        else:
+            stream.conn.close()
+        self.mode = mode
+
+    def stream_refresh(self):
+        """Read from the MJPEG stream and emit the newest completed JPEG."""
+        data = self.stream.response.read1(65536)
+        if not data:
+            raise ConnectionResetError("MJPEG stream closed by the camera")
+        self.stream_data(data)
+
+    def stream_data(self, data: bytes):
+        """Parse data read from an MJPEG stream and emit the newest completed JPEG."""
+        payloads = self.parser.feed(data)
+        if not payloads:
+            return
+        received = time.monotonic()
+        # Parts that arrive faster than the frame rate are not worth decoding
+        if received - self.last_emit < 1 / self.fps:
+            self.skipped_parts += len(payloads)
+            return
+        self.skipped_parts += len(payloads) - 1
+        self.emit_jpeg(payloads[-1], received)
+
+    def capture_refresh(self):
+        """Ask the cv2.VideoCapture reader for its newest frame, for feeds we can't
+        parse ourselves. The frame is emitted from the reader's thread."""
+        reader = self.capture
+        if reader is None or not reader.running:
+            if reader is not None and reader.error:
+                self.show_error(f"Capture Error: {reader.error}")
+            reader = self.capture = CaptureReader(self.url, self.capture_frame)
+            reader.start()
+        reader.request()
+
+    def capture_frame(self, currentFrame: np.ndarray, grabbed: float):
+        """Emit a frame retrieved by the capture reader."""
+        frame = Frame(timestamp=grabbed, source=self.url)
+        frame.mark("retrieve")
+        if self.history is not None:
+            self.history.append(grabbed, currentFrame)
+        self.decoder.submit_image(array_to_qimage(currentFrame), frame)
+        self.scheduler.count_frame()
+
+    def emit_jpeg(
+        self,
+        data: bytes,
+        received: Optional[float] = None,
+        started: Optional[float] = None,
+    ):
+        """Queue a JPEG for decoding, imageReady is emitted by the decode pool.
+
+        A JPEG identical to the last one is not decoded or emitted at all, so the
+        widgets showing it don't run their plugins or repaint either.
+
+        Args:
+            data (bytes): The JPEG.
+            received (Optional[float]): time.monotonic() when it arrived, defaults
+                to now.
+            started (Optional[float]): time.monotonic() when it was requested, to
+                time the fetch.
+        """
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        if digest == self.last_digest:
+            self.frame_unchanged()
+            return
+        self.last_digest = digest
+        if received is None:
+            received = time.monotonic()
+        self.showing_error = False
+        self.last_emit = received
+        if self.history is not None:
+            self.history.append(received, data)
+        frame = Frame(timestamp=received, source=self.url)
+        if started is not None:
+            frame.time_stage("fetch", started)
+        self.decoder.submit(data, frame)
+        self.scheduler.count_frame()
+
+    def frame_decoded(self, frame: Frame):
+        """Called by the decoder with every frame, in order."""
+        self.stats.record(frame)
+        self.imageReady.emit(frame)
+
+    def frame_unchanged(self):
+        """Count a frame the camera hasn't changed since the last one."""
+        self.unchanged_frames += 1
+        self.stats.record_unchanged()
+        self.scheduler.count_frame()
+        self.frameUnchanged.emit()
+
+    def update_validators(self, headers):
+        """Remember the ETag and Last-Modified headers for conditional requests.
+
+        Args:
+            headers: The response headers, looked up by lower case name.
+        """
+        validators = {}
+        etag = headers.get("etag")
+        if etag:
+            validators["If-None-Match"] = etag
+        last_modified = headers.get("last-modified")
+        if last_modified:
+            validators["If-Modified-Since"] = last_modified
+        self.validators = validators
+
+    def refresh(self):
+        """Make sure the next frame is emitted, even if the camera hasn't changed it."""
+        self.validators = {}
+        self.last_digest = None
+
+    def show_error(self, message: str):
+        """Emit an error image, and detect the kind of feed again on the next try."""
+        self.refresh()
+        self.close_stream()
+        self.mode = None if self.mode != MODE_CAPTURE else MODE_CAPTURE
+        if self.reconnect or self.paused or not self.acquire:
+            # The fetch was cancelled on purpose, not worth showing
+            return
+        self.showing_error = True
+        self.decoder.submit_image(self.draw_message(message), Frame(source=self.url))
+
+    def close_capture(self):
+        if self.capture:
+            self.capture.stop()
+            self.capture = None
+
+    def close_stream(self):
+        stream = self.stream
+        if stream:
+            self.stream = None
+            self.parser = None
+            stream.response.close()
+            stream.conn.close()
+
+    def cancel(self):
+        """Abort the fetch in flight, from any thread.
+
+        Used when the URL changes or acquisition stops, so the thread doesn't sit
+        out the rest of a request whose frame nobody wants any more.
+        """
+        self.pool.cancel(self.url)
+        stream = self.stream
+        if stream:
+            _abort_socket(stream.sock)
+
+    @property
+    def fetch_timeout(self) -> float:
+        """Seconds a single frame fetch may take before it is abandoned."""
+        return max(self.timeout_periods / max(self.fps, 0.001), self.min_timeout)
 
     def __init__(self, *args, fps=5, url="", parent=None, **kwargs):
         # QThread.__init__(self, *args, **kwargs)
         super().__init__(parent)
         self.fps = fps
         self.url = url
+        self.pool = connection_pool
         self.showing_error = False
         self.manager = QNetworkAccessManager(self)
         self.request = QNetworkRequest()
         self.request.setUrl(QUrl(self.url))
         self.buffer = QByteArray()
         self.reply: Optional[QNetworkReply] = None
-        self.isMjpegFeed = False
+        self.mode: Optional[str] = feed_mode(self.url)
+        # Reads cv2.VideoCapture feeds, see capture_refresh
+        self.capture: Optional[CaptureReader] = None
+        self.stream: Optional[Stream] = None
+        self.parser: Optional[MultipartParser] = None
+        self.last_emit = 0.0
+        self.skipped_parts = 0
+        # Conditional request headers, and a hash of the last JPEG for servers that
+        # don't send validators, so unchanged frames are neither decoded nor shown
+        self.validators: Dict[str, str] = {}
+        self.last_digest: Optional[bytes] = None
+        self.unchanged_frames = 0
+        # The last few seconds of frames, see enable_history
+        self.history: Optional[FrameHistory] = None
+        # Rate, latency and timings of the decoded frames
+        self.stats = FrameStats()
+        self.decoder = FrameDecoder(self.frame_decoded)
+        self.scheduler = FrameScheduler(fps)
+        self.reconnect = False
         self.acquire = True
+        # Set while nobody can see the feed, the thread waits for resume()
+        self.paused = False
+        self._unpaused = threading.Event()
+        self._unpaused.set()
+        # Set to cut the wait for the next frame short
+        self._wake = threading.Event()
+        # Guards acquire against run() deciding to return, see start()
+        self._run_lock = threading.Lock()
+        self._finishing = False
+        # A fetch is abandoned after this many frame periods, but never sooner than
+        # min_timeout seconds, so a slow but healthy camera still delivers frames at
+        # whatever rate it manages. A stuck camera is retried on the next frame slot.
+        self.timeout_periods = 2
+        self.min_timeout = 2.0
+        # Seconds an MJPEG stream may go without sending data before reconnecting
+        self.stream_timeout = 5.0
 
         self.error_qimage = QPixmap(400, 400).toImage()
-        self.painter = QPainter(self.error_qimage)
-        self.painter.setBrush(QBrush(Qt.green))
-        self.painter.fillRect(QRectF(0, 0, 1000, 1000), Qt.green)
-        self.painter.fillRect(QRectF(100, 100, 200, 100), Qt.white)
-        self.painter.setPen(QPen(Qt.black))
+        painter = QPainter(self.error_qimage)
+        painter.setBrush(QBrush(Qt.green))
+        painter.fillRect(QRectF(0, 0, 1000, 1000), Qt.green)
+        painter.fillRect(QRectF(100, 100, 200, 100), Qt.white)
+        painter.end()
 
     def setUrl(self, url: str) -> None:
+        self.reconnect = True
+        if url != self.url:
+            self.cancel()
+            if self.history is not None:
+                self.history.clear()
+                self.history.source = url
         self.url = url
+        self.refresh()
         self.request.setUrl(QUrl(self.url))
-        if self.url.lower().endswith("mjpg") or self.url.lower().endswith("cgi"):
-            self.isMjpegFeed = True
-            self.mjpegCamera = VideoCapture(self.url)
-        else:
-            self.isMjpegFeed = False
-            self.mjpegCamera = None
+        # The feed is requested, and its type detected, by the acquisition thread
+        self.mode = feed_mode(self.url)
+        self.close_capture()
 
     def setFPS(self, fps: int) -> None:
+        faster = fps > self.fps
         self.fps = fps
+        self.scheduler.set_fps(fps)
+        if faster:
+            # Don't sit out the rest of a long period at the old rate
+            self._wake.set()
+
+    def enable_history(
+        self, seconds: float, max_bytes: Optional[int] = None
+    ) -> FrameHistory:
+        """Keep the last `seconds` of frames in memory, see FrameHistory.
+
+        The history is only ever extended, so widgets sharing the feed get at least
+        the history they asked for.
+        """
+        if self.history is None:
+            self.history = FrameHistory(seconds, source=self.url)
+        self.history.seconds = max(self.history.seconds, seconds)
+        if max_bytes is not None:
+            self.history.max_bytes = max(self.history.max_bytes, max_bytes)
+        return self.history
+
+    @property
+    def achieved_fps(self) -> float:
+        """Frame rate actually delivered, to compare with the target `fps`."""
+        return self.scheduler.achieved_fps
+
+    @property
+    def fetch_stats(self) -> FetchStats:
+        """Connection reuse and latency counters for the current URL."""
+        return self.pool.stats(self.url)
 
     def updateCam(self, camera_object):
         self.camera_object = camera_object
 
     def run(self):
+        self.scheduler.start()
+        while True:
+            self._acquire_frames()
+            with self._run_lock:
+                # start() may have been called again since stop()
+                if not self.acquire:
+                    self._finishing = True
+                    return
+
+    def _acquire_frames(self):
         while self.acquire:
+            if self.paused:
+                # Let go of the camera until the feed is wanted again
+                self.close_stream()
+                self.close_capture()
+                self._unpaused.wait()
+                self.scheduler.resync()
+                continue
+            if self.reconnect:
+                self.reconnect = False
+                self.close_stream()
+                self.close_capture()
             self.camera_refresh()
-            self.msleep(int(1000 / self.fps))
+            # An MJPEG stream is paced by the camera, blocking on the next read
+            if self.mode != MODE_MJPEG:
+                # Wait for the next frame's deadline, less the time the fetch took,
+                # unless woken up to stop, pause or change the frame rate
+                if self._wake.wait(max(self.scheduler.next_frame(), 0)):
+                    self._wake.clear()
+                    self.scheduler.resync()
+            else:
+                self.scheduler.resync()
+        self.close_stream()
+        self.close_capture()
 
     def start(self):
-        self.acquire = True
+        """Start acquiring frames.
+
+        Doesn't block if the thread is still finishing after stop(), the running
+        thread carries on acquiring instead.
+        """
+        with self._run_lock:
+            self.acquire = True
+            self._wake.clear()
+            if self.isRunning() and not self._finishing:
+                return
+        # Only waits for a run() that has already decided to return
+        self.wait()
+        self._finishing = False
         super().start()
 
     def stop(self):
         self.acquire = False
+        self._unpaused.set()
+        self._wake.set()
+        self.cancel()
+        self.close_capture()
+
+    def pause(self):
+        """Stop fetching frames, without stopping the thread, until resume()."""
+        self.paused = True
+        self._unpaused.clear()
+        self._wake.set()
+        self.cancel()
+
+    def resume(self):
+        """Fetch frames again after pause(), starting with a fresh one."""
+        self.paused = False
+        self.refresh()
+        self._unpaused.set()
 
     def draw_message(self, message: str) -> QImage:
-        self.painter.drawText(QRectF(100, 100, 200, 100), message)
-        return self.error_qimage
+        # Paint on a copy, this may be called from the acquisition engine's thread
+        # and a painter left active on the image crashes when the thread is deleted
+        image = self.error_qimage.copy()
+        painter = QPainter(image)
+        painter.setPen(QPen(Qt.black))
+        painter.drawText(QRectF(100, 100, 200, 100), message)
+        painter.end()
+        return image
@@ -0,0 +1,295 @@
+import asyncio
+import ssl
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from qmicroscope.utils.mjpeg import MultipartParser, boundary_from_content_type
+from qmicroscope.widgets.downloader import (
+    MODE_CAPTURE,
+    MODE_MJPEG,
+    VideoThread,
+    feed_mode,
+    split_url,
+)
+
+
+class CameraConnection:
+    """A keep-alive HTTP/1.1 connection owned by a single camera task.
+
+    Args:
+        key: The (scheme, host, port) to connect to.
+    """
+
+    def __init__(self, key: Tuple[str, str, int]) -> None:
+        self.key = key
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def open(self) -> None:
+        scheme, host, port = self.key
+        context = ssl.create_default_context() if scheme == "https" else None
+        self.reader, self.writer = await asyncio.open_connection(
+            host, port, ssl=context
+        )
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = None
+        self.writer = None
+
+    async def request(
+        self, target: str, headers: Dict[str, str]
+    ) -> Tuple[int, Dict[str, str]]:
+        """Send a GET request and read the status line and headers.
+
+        An idle connection the server has dropped is reopened once.
+
+        Returns:
+            The status code and the response headers, with lower case names.
+        """
+        scheme, host, port = self.key
+        if port != (443 if scheme == "https" else 80):
+            host = f"{host}:{port}"
+        lines = [f"GET {target} HTTP/1.1", f"Host: {host}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+        while True:
+            reused = self.writer is not None
+            if not reused:
+                await self.open()
+            try:
+                self.writer.write(request)
+                await self.writer.drain()
+                status_line = await self.reader.readline()
+                if not status_line:
+                    raise ConnectionResetError("connection closed by the camera")
+            except ConnectionError:
+                self.close()
+                if reused:
+                    continue
+                raise
+            break
+
+        status = int(status_line.split(None, 2)[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+        return status, response_headers
+
+    async def read_body(self, status: int, headers: Dict[str, str]) -> bytes:
+        """Read the body of the response to the last request."""
+        if status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    # Skip any trailers
+                    while await self.reader.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await self.reader.read()
+            self.close()
+            return body
+
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return body
+
+
+class AcquisitionEngine:
+    """Acquires many cameras on one asyncio event loop in a background thread.
+
+    Each camera is a task on the loop instead of a VideoThread of its own, so a wall of
+    64 cameras needs one thread rather than 64. The tasks pace, fetch and emit frames
+    through the camera's VideoThread (its scheduler, decoder and imageReady signal), so
+    widgets can't tell the difference. Feeds that have to go through cv2.VideoCapture
+    are handed back to their own VideoThread.
+
+    Args:
+        max_concurrency: Maximum number of frame requests in flight at once.
+    """
+
+    def __init__(self, max_concurrency: int = 16) -> None:
+        self.max_concurrency = max_concurrency
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Dict[VideoThread, asyncio.Task] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the event loop thread, if it isn't running yet."""
+        if self.running:
+            return
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(ready,), name="qmicroscope-acquisition", daemon=True
+        )
+        self._thread.start()
+        ready.wait()
+
+    def stop(self) -> None:
+        """Stop acquiring every camera and shut the event loop down."""
+        if not self.running:
+            return
+        for camera in list(self._tasks):
+            camera.stop()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(2)
+        self._thread = None
+
+    def add(self, camera: VideoThread) -> None:
+        """Start acquiring a camera on the engine instead of its own thread."""
+        self.start()
+        camera.acquire = True
+        self.loop.call_soon_threadsafe(self._spawn, camera)
+
+    def remove(self, camera: VideoThread) -> None:
+        """Stop acquiring a camera."""
+        camera.stop()
+        if self.running:
+            self.loop.call_soon_threadsafe(self._cancel, camera)
+
+    def is_acquiring(self, camera: VideoThread) -> bool:
+        return camera in self._tasks
+
+    def _run(self, ready: threading.Event) -> None:
+        asyncio.set_event_loop(self.loop)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        ready.set()
+        try:
+            self.loop.run_forever()
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(
+                asyncio.gather(*tasks, return_exceptions=True)
+            )
+        finally:
+            self._tasks.clear()
+            self.loop.close()
+
+    def _spawn(self, camera: VideoThread) -> None:
+        self._cancel(camera)
+        task = self.loop.create_task(self._acquire(camera))
+        self._tasks[camera] = task
+        task.add_done_callback(lambda t: self._forget(camera, t))
+
+    def _cancel(self, camera: VideoThread) -> None:
+        task = self._tasks.pop(camera, None)
+        if task:
+            task.cancel()
+
+    def _forget(self, camera: VideoThread, task: asyncio.Task) -> None:
+        if self._tasks.get(camera) is task:
+            del self._tasks[camera]
+
+    async def _acquire(self, camera: VideoThread) -> None:
+        """Acquire frames for one camera until it is stopped."""
+        conn: Optional[CameraConnection] = None
+        camera.scheduler.start()
+        try:
+            while camera.acquire:
+                if camera.reconnect:
+                    camera.reconnect = False
+                    camera.mode = feed_mode(camera.url)
+                    if conn:
+                        conn.close()
+                        conn = None
+                if camera.mode == MODE_CAPTURE:
+                    # cv2.VideoCapture blocks, leave those feeds to their own thread
+                    camera.start()
+                    return
+
+                key, target, headers = split_url(camera.url, camera.validators)
+                if conn is None or conn.key != key:
+                    if conn:
+                        conn.close()
+                    conn = CameraConnection(key)
+                try:
+                    await self._fetch(camera, conn, target, headers)
+                except asyncio.CancelledError:
+                    raise
+                except asyncio.TimeoutError:
+                    conn.close()
+                    camera.show_error(f"Timeout Error: {camera.url}")
+                except OSError as e:
+                    conn.close()
+                    camera.show_error(f"OSError {e}: {camera.url}")
+                except Exception as e:
+                    conn.close()
+                    camera.show_error(f"Exception {e}: {camera.url}")
+                await asyncio.sleep(camera.scheduler.next_frame())
+        finally:
+            if conn:
+                conn.close()
+
+    async def _fetch(
+        self,
+        camera: VideoThread,
+        conn: CameraConnection,
+        target: str,
+        headers: Dict[str, str],
+    ) -> None:
+        """Fetch one frame, or follow an MJPEG stream until it ends."""
+        async with self._semaphore:
+            started = time.monotonic()
+            status, response_headers = await asyncio.wait_for(
+                conn.request(target, headers), camera.fetch_timeout
+            )
+            content_type = response_headers.get("content-type", "")
+            mode = feed_mode(camera.url, content_type)
+            if status < 400 and mode != MODE_MJPEG:
+                body = await asyncio.wait_for(
+                    conn.read_body(status, response_headers), camera.fetch_timeout
+                )
+
+        if status >= 400:
+            conn.close()
+            camera.show_error(f"URLError: {camera.url}")
+        elif status == 304:
+            camera.frame_unchanged()
+        elif mode == MODE_MJPEG:
+            await self._follow_stream(camera, conn, content_type)
+        else:
+            camera.mode = mode
+            if mode != MODE_CAPTURE:
+                camera.update_validators(response_headers)
+                camera.emit_jpeg(body, started=started)
+
+    async def _follow_stream(
+        self, camera: VideoThread, conn: CameraConnection, content_type: str
+    ) -> None:
+        camera.mode = MODE_MJPEG
+        camera.parser = MultipartParser(boundary_from_content_type(content_type))
+        timeout = max(camera.stream_timeout, camera.fetch_timeout)
+        try:
+            while camera.acquire and not camera.reconnect:
+                data = await asyncio.wait_for(conn.reader.read(65536), timeout)
+                if not data:
+                    raise ConnectionResetError("MJPEG stream closed by the camera")
+                camera.stream_data(data)
+                camera.scheduler.resync()
+        finally:
+            # A stream can't be reused for another request
+            conn.close()
+            camera.parser = None
@@ -0,0 +1,54 @@
+from typing import Optional
+
+from qtpy.QtCore import QRectF, Qt
+from qtpy.QtGui import QImage, QPainter
+from qtpy.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem, QWidget
+
+
+class ImageItem(QGraphicsItem):
+    """A graphics item that paints a QImage as it is.
+
+    QGraphicsPixmapItem needs every frame converted to a QPixmap first, a full-frame
+    conversion and allocation even when the frame is shown scaled down. This item
+    keeps the QImage and draws it straight onto the view, so the raster engine only
+    converts the pixels that end up on screen, and a new frame only invalidates the
+    item's own rect.
+    """
+
+    def __init__(self, parent: Optional[QGraphicsItem] = None) -> None:
+        super().__init__(parent)
+        self._image = QImage()
+        self._mode = Qt.SmoothTransformation
+
+    def image(self) -> QImage:
+        return self._image
+
+    def setImage(self, image: QImage) -> None:
+        if image.size() != self._image.size():
+            self.prepareGeometryChange()
+        self._image = image
+        self.update()
+
+    def transformationMode(self) -> Qt.TransformationMode:
+        return self._mode
+
+    def setTransformationMode(self, mode: Qt.TransformationMode) -> None:
+        if mode != self._mode:
+            self._mode = mode
+            self.update()
+
+    def boundingRect(self) -> QRectF:
+        return QRectF(0, 0, self._image.width(), self._image.height())
+
+    def paint(
+        self,
+        painter: QPainter,
+        option: QStyleOptionGraphicsItem,
+        widget: Optional[QWidget] = None,
+    ) -> None:
+        if self._image.isNull():
+            return
+        painter.setRenderHint(
+            QPainter.SmoothPixmapTransform, self._mode == Qt.SmoothTransformation
+        )
+        painter.drawImage(0, 0, self._image)
@@ -0,0 +1,28 @@
+from typing import Dict, NamedTuple, Optional
+
+# The tiers a Container puts its microscopes in
+FOCUSED = "focused"  # The camera the user is working with
+THUMBNAIL = "thumbnail"  # Visible, but only glanced at
+BACKGROUND = "background"  # Can't be seen at the moment
+
+
+class QosTier(NamedTuple):
+    """How much of the CPU and network budget a microscope gets.
+
+    Attributes:
+        fps (Optional[float]): Maximum frame rate, None for the microscope's own
+            fps. 0 pauses acquisition.
+        max_width (Optional[int]): Maximum width frames are decoded at, None for
+            the size the microscope displays them at.
+    """
+
+    fps: Optional[float] = None
+    max_width: Optional[int] = None
+
+
+def default_tiers() -> Dict[str, QosTier]:
+    return {
+        FOCUSED: QosTier(),
+        THUMBNAIL: QosTier(fps=5, max_width=320),
+        BACKGROUND: QosTier(fps=0, max_width=160),
+    }
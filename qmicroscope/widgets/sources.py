@@ -0,0 +1,255 @@
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from qtpy.QtCore import Qt
+
+from qmicroscope.utils.frame import Frame
+from qmicroscope.utils.mailbox import FrameMailbox
+from qmicroscope.widgets.downloader import VideoThread
+
+if TYPE_CHECKING:
+    from qmicroscope.widgets.engine import AcquisitionEngine
+
+
+class Subscription:
+    """A mailbox receiving a shared feed at its own frame rate."""
+
+    __slots__ = ("mailbox", "fps", "target_size", "last_delivery", "pending")
+
+    def __init__(self, mailbox: FrameMailbox, fps: float) -> None:
+        self.mailbox = mailbox
+        self.fps = fps
+        # Size the subscriber displays frames at, None for full resolution
+        self.target_size: Optional[Tuple[int, int]] = None
+        self.last_delivery = 0.0
+        # The newest frame that came too soon after the last one to be delivered
+        self.pending: Optional[Frame] = None
+
+
+class SharedSource:
+    """A camera feed that is fetched and decoded once for every widget showing it.
+
+    The source's VideoThread runs at the highest frame rate any subscriber asked for,
+    and each subscriber's mailbox only gets frames at the rate it asked for. A
+    subscriber asking for 0 fps gets no frames, and if they all do acquisition is
+    paused until one asks for frames again. A frame that comes too soon for a
+    subscriber is held back and delivered once its frame period is up, so a slow
+    subscriber still gets the latest image of a camera that has stopped changing. Frames are decoded at the smallest
+    reduced resolution that covers every subscriber's display size.
+
+    Args:
+        url: The camera URL.
+
+    Attributes:
+        thread (VideoThread): The thread that acquires and decodes the feed.
+        engine (Optional[AcquisitionEngine]): If set, the feed is acquired on this
+            engine's event loop rather than on `thread`.
+        paused (bool): Whether acquisition is paused, see above.
+    """
+
+    # A frame is delivered if it is at least this fraction of the subscriber's
+    # frame period after the last one, so jitter doesn't halve the frame rate
+    delivery_tolerance = 0.8
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.engine: "Optional[AcquisitionEngine]" = None
+        self.paused = False
+        self.thread = VideoThread(url=url)
+        self._subscriptions: Dict[FrameMailbox, Subscription] = {}
+        self._lock = threading.Lock()
+        self.thread.imageReady.connect(self._fan_out, Qt.DirectConnection)
+        self.thread.frameUnchanged.connect(self._deliver_pending, Qt.DirectConnection)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscriptions)
+
+    @property
+    def running(self) -> bool:
+        return (
+            self.paused
+            or (self.thread.isRunning() and self.thread.acquire)
+            or bool(self.engine and self.engine.is_acquiring(self.thread))
+        )
+
+    def subscribe(
+        self,
+        mailbox: FrameMailbox,
+        fps: float,
+        engine: "Optional[AcquisitionEngine]" = None,
+    ) -> None:
+        """Start delivering frames to a mailbox, starting acquisition if needed.
+
+        Args:
+            mailbox: Where this subscriber's frames are put.
+            fps: The frame rate this subscriber wants.
+            engine: Engine to acquire on, used if acquisition isn't running yet.
+        """
+        with self._lock:
+            self._subscriptions[mailbox] = Subscription(mailbox, fps)
+        # The new subscriber needs a frame even if the camera's image is static
+        self.thread.refresh()
+        self._update_target_size()
+        if not self.running:
+            self.engine = engine
+            self.thread.setUrl(self.url)
+            if self.engine:
+                self.engine.add(self.thread)
+            else:
+                self.thread.start()
+        self._update_fps()
+
+    def unsubscribe(self, mailbox: FrameMailbox, wait: bool = True) -> None:
+        """Stop delivering frames to a mailbox, stopping acquisition if it was the last.
+
+        Args:
+            mailbox: The subscriber's mailbox.
+            wait: Whether to wait for the acquisition thread to finish if it is
+                stopped. subscribe() copes with a thread that is still finishing.
+        """
+        with self._lock:
+            self._subscriptions.pop(mailbox, None)
+            remaining = len(self._subscriptions)
+        if remaining:
+            self._update_fps()
+            self._update_target_size()
+        else:
+            self.stop(wait)
+
+    def set_fps(self, mailbox: FrameMailbox, fps: float) -> None:
+        """Change the frame rate of one subscriber."""
+        with self._lock:
+            subscription = self._subscriptions.get(mailbox)
+            if subscription:
+                subscription.fps = fps
+                if fps <= 0:
+                    subscription.pending = None
+        self._update_fps()
+
+    def set_target_size(
+        self, mailbox: FrameMailbox, size: Optional[Tuple[int, int]]
+    ) -> None:
+        """Change the size one subscriber displays frames at.
+
+        Args:
+            mailbox: The subscriber's mailbox.
+            size: (width, height), 0 for a dimension that doesn't matter, or None if
+                the subscriber needs full resolution frames.
+        """
+        with self._lock:
+            subscription = self._subscriptions.get(mailbox)
+            if subscription:
+                subscription.target_size = size
+        self._update_target_size()
+
+    def stop(self, wait: bool = True) -> None:
+        if self.engine:
+            self.engine.remove(self.thread)
+        self.paused = self.thread.paused = False
+        self.thread.stop()
+        if wait:
+            self.thread.wait(500)
+
+    def _update_fps(self) -> None:
+        with self._lock:
+            rates = [s.fps for s in self._subscriptions.values()]
+        if not rates:
+            return
+        fps = max(rates)
+        if fps > 0:
+            self.thread.setFPS(fps)
+        self._set_paused(fps <= 0)
+
+    def _set_paused(self, paused: bool) -> None:
+        if paused == self.paused:
+            return
+        self.paused = paused
+        if self.engine:
+            if paused:
+                self.engine.remove(self.thread)
+            else:
+                self.thread.refresh()
+                self.engine.add(self.thread)
+        elif paused:
+            self.thread.pause()
+        else:
+            self.thread.resume()
+
+    def _update_target_size(self) -> None:
+        with self._lock:
+            sizes = [s.target_size for s in self._subscriptions.values()]
+        if not sizes or None in sizes:
+            target = None
+        else:
+            target = (max(w for w, h in sizes), max(h for w, h in sizes))
+        if target != self.thread.decoder.target_size:
+            self.thread.decoder.target_size = target
+            self.thread.refresh()
+
+    def _fan_out(self, frame: Frame) -> None:
+        """Runs on the decode threads for every frame of the feed."""
+        self._deliver(frame)
+
+    def _deliver_pending(self) -> None:
+        """Runs on the acquisition thread when the camera's image hasn't changed."""
+        self._deliver(None)
+
+    def _deliver(self, frame: Optional[Frame]) -> None:
+        """Put a new frame, or the ones held back, in the mailboxes that are due one.
+
+        Args:
+            frame: The new frame, or None to only deliver the held back frames.
+        """
+        now = time.monotonic()
+        deliveries = []
+        with self._lock:
+            for subscription in self._subscriptions.values():
+                if subscription.fps <= 0:
+                    continue
+                if frame is not None:
+                    subscription.pending = frame
+                elif subscription.pending is None:
+                    continue
+                period = 1.0 / subscription.fps
+                if now - subscription.last_delivery >= period * self.delivery_tolerance:
+                    subscription.last_delivery = now
+                    deliveries.append((subscription.mailbox, subscription.pending))
+                    subscription.pending = None
+        for mailbox, pending in deliveries:
+            mailbox.put(pending)
+
+
+class SourceRegistry:
+    """Process-wide map from camera URL to the SharedSource acquiring it.
+
+    Sources are kept once created, stopped when nobody is subscribed, so their
+    threads are never deleted while still running.
+    """
+
+    def __init__(self) -> None:
+        self._sources: Dict[str, SharedSource] = {}
+
+    def source(self, url: str) -> SharedSource:
+        """Return the source for a URL, creating it if needed."""
+        source = self._sources.get(url)
+        if source is None:
+            source = self._sources[url] = SharedSource(url)
+        return source
+
+    def subscribe(
+        self,
+        url: str,
+        mailbox: FrameMailbox,
+        fps: float,
+        engine: "Optional[AcquisitionEngine]" = None,
+    ) -> SharedSource:
+        """Subscribe a mailbox to the feed at a URL, see SharedSource.subscribe."""
+        source = self.source(url)
+        source.subscribe(mailbox, fps, engine)
+        return source
+
+
+# Shared by every Microscope in the process
+source_registry = SourceRegistry()
@@ -0,0 +1,214 @@
+import math
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from qtpy.QtCore import QPoint, QRect, QSize, Qt, Signal
+from qtpy.QtGui import QImage, QMouseEvent, QPainter, QPaintEvent
+from qtpy.QtWidgets import QWidget
+
+from qmicroscope.utils.mailbox import FrameMailbox
+from qmicroscope.widgets.display import DisplayScheduler
+from qmicroscope.widgets.sources import SharedSource, source_registry
+
+if TYPE_CHECKING:
+    from qmicroscope.widgets.engine import AcquisitionEngine
+
+
+class Tile:
+    """A camera on a VideoWall."""
+
+    __slots__ = ("url", "fps", "settings_group", "mailbox", "source", "image")
+
+    def __init__(self, url: str, fps: float, settings_group: str, parent) -> None:
+        self.url = url
+        self.fps = fps
+        # Emitted by clicked_url, like a Microscope's settings group
+        self.settings_group = settings_group
+        self.mailbox = FrameMailbox(parent)
+        self.source: Optional[SharedSource] = None
+        self.image = QImage()
+
+
+class VideoWall(QWidget):
+    """Many camera feeds painted as tiles of a single widget.
+
+    A grid of Microscopes costs a scene, a view and a set of plugins per camera,
+    which adds up for an overview of dozens of cameras. The wall has none of that:
+    each tile is the newest frame of its camera, blitted into its cell. New frames
+    are taken once per display tick, only the tiles that changed are repainted, all
+    in one paint pass, and frames are decoded at about the tile size.
+
+    Clicking a tile emits clicked_url with the tile's settings group, like clicking
+    a Microscope, so it can be wired to the same slot.
+
+    Args:
+        parent (Optional[QWidget]): Parent widget.
+        max_display_hz (float): Maximum repaints per second, see DisplayScheduler.
+        engine (Optional[AcquisitionEngine]): Engine to acquire the feeds on.
+
+    Attributes:
+        columns (int): Tiles per row.
+        spacing (int): Pixels between tiles.
+        smooth_scaling (bool): Interpolate when scaling frames into their tiles.
+    """
+
+    clicked_url: Signal = Signal(str)
+
+    def __init__(
+        self,
+        parent: Optional[QWidget] = None,
+        max_display_hz: float = 30.0,
+        engine: "Optional[AcquisitionEngine]" = None,
+    ) -> None:
+        super().__init__(parent)
+        self.columns = 8
+        self.spacing = 1
+        self.smooth_scaling = False
+        self.engine = engine
+        self.tiles: List[Tile] = []
+        self.display_scheduler = DisplayScheduler(max_display_hz, self)
+        self._acquiring = False
+        self._hidden = False
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+    def sizeHint(self) -> QSize:
+        return QSize(800, 600)
+
+    @property
+    def rows(self) -> int:
+        return max(1, math.ceil(len(self.tiles) / max(self.columns, 1)))
+
+    def addTile(self, url: str, fps: float = 5, settings_group: str = "") -> int:
+        """Add a camera, acquired straight away if the wall is acquiring.
+
+        Returns:
+            int: The index of the tile.
+        """
+        tile = Tile(url, fps, settings_group, self)
+        tile.mailbox.frameReady.connect(self._frameReady)
+        self.tiles.append(tile)
+        if self._acquiring:
+            self._subscribe(tile)
+        self.update()
+        return len(self.tiles) - 1
+
+    def clear(self) -> None:
+        """Remove every tile."""
+        for tile in self.tiles:
+            self._unsubscribe(tile)
+            tile.mailbox.frameReady.disconnect(self._frameReady)
+            tile.mailbox.deleteLater()
+        self.tiles = []
+        self.update()
+
+    def start(self, acquire: bool = True) -> None:
+        """Start or stop acquiring every tile's camera."""
+        self._acquiring = acquire
+        for tile in self.tiles:
+            if acquire:
+                self._subscribe(tile)
+            else:
+                self._unsubscribe(tile)
+
+    def _subscribe(self, tile: Tile) -> None:
+        if tile.source is None:
+            tile.source = source_registry.subscribe(
+                tile.url, tile.mailbox, 0 if self._hidden else tile.fps, self.engine
+            )
+            tile.source.set_target_size(tile.mailbox, self._decodeSize())
+
+    def _unsubscribe(self, tile: Tile) -> None:
+        if tile.source is not None:
+            tile.source.unsubscribe(tile.mailbox)
+            tile.source = None
+            tile.mailbox.clear()
+
+    def _frameReady(self) -> None:
+        if self.display_scheduler.max_hz > 0:
+            self.display_scheduler.schedule(self)
+        else:
+            self.takeFrame()
+
+    def takeFrame(self) -> None:
+        """Take the frames waiting for any tile and repaint those tiles."""
+        for index, tile in enumerate(self.tiles):
+            frame = tile.mailbox.take()
+            if frame is not None:
+                self.setImage(index, frame.image)
+
+    def setImage(self, index: int, image: QImage) -> None:
+        """Show an image in a tile."""
+        self.tiles[index].image = image
+        self.update(self.tileRect(index))
+
+    def tileSize(self) -> QSize:
+        columns = max(self.columns, 1)
+        width = (self.width() - self.spacing * (columns - 1)) // columns
+        height = (self.height() - self.spacing * (self.rows - 1)) // self.rows
+        return QSize(max(width, 1), max(height, 1))
+
+    def tileRect(self, index: int) -> QRect:
+        """The cell a tile is painted in."""
+        size = self.tileSize()
+        row, column = divmod(index, max(self.columns, 1))
+        return QRect(
+            column * (size.width() + self.spacing),
+            row * (size.height() + self.spacing),
+            size.width(),
+            size.height(),
+        )
+
+    def tileAt(self, pos: QPoint) -> Optional[int]:
+        """The index of the tile at a position, None if there is none."""
+        size = self.tileSize()
+        column, x = divmod(pos.x(), size.width() + self.spacing)
+        row, y = divmod(pos.y(), size.height() + self.spacing)
+        if x >= size.width() or y >= size.height() or column >= self.columns:
+            return None
+        index = row * self.columns + column
+        return index if 0 <= index < len(self.tiles) else None
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), Qt.black)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, self.smooth_scaling)
+        for index, tile in enumerate(self.tiles):
+            rect = self.tileRect(index)
+            if tile.image.isNull() or not event.rect().intersects(rect):
+                continue
+            # Fit the frame in its cell, keeping the aspect ratio
+            size = tile.image.size().scaled(rect.size(), Qt.KeepAspectRatio)
+            target = QRect(QPoint(0, 0), size)
+            target.moveCenter(rect.center())
+            painter.drawImage(target, tile.image)
+        painter.end()
+
+    def mousePressEvent(self, event: QMouseEvent) -> None:
+        index = self.tileAt(event.pos())
+        if index is not None:
+            self.clicked_url.emit(self.tiles[index].settings_group)
+        super().mousePressEvent(event)
+
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        size = self._decodeSize()
+        for tile in self.tiles:
+            if tile.source is not None:
+                tile.source.set_target_size(tile.mailbox, size)
+
+    def _decodeSize(self) -> Tuple[int, int]:
+        return (self.tileSize().width(), 0)
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        self._setHidden(False)
+
+    def hideEvent(self, event) -> None:
+        super().hideEvent(event)
+        self._setHidden(True)
+
+    def _setHidden(self, hidden: bool) -> None:
+        # Nothing is acquired for a wall that can't be seen, see Microscope.hidden_fps
+        self._hidden = hidden
+        for tile in self.tiles:
+            if tile.source is not None:
+                tile.source.set_fps(tile.mailbox, 0 if hidden else tile.fps)
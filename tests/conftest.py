@@ -0,0 +1,139 @@
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+import pytest
+
+
+def make_jpeg(width: int = 64, height: int = 48, value: int = 0) -> bytes:
+    """A JPEG of a single grey level."""
+    array = np.full((height, width, 3), value, dtype=np.uint8)
+    return cv2.imencode(".jpg", array)[1].tobytes()
+
+
+class CameraServer:
+    """An HTTP server pretending to be cameras, one per path.
+
+    Attributes:
+        body (bytes): What every path serves unless it is in `bodies`.
+        bodies (Dict[str, Optional[bytes]]): What a path serves, None for a 404.
+        delays (Dict[str, float]): Seconds a path takes to answer.
+        delay (float): Seconds every other path takes to answer.
+        etags (Dict[str, str]): ETag of a path, answered with 304 when it matches.
+        requests (Counter): Number of requests by path.
+        changing (bool): Serve a different image on every request, instead of `body`.
+        streams (Dict[str, float]): Paths served as MJPEG streams of a different image
+            in every part, and how many parts per second they send.
+        stream_parts (Optional[int]): Parts a stream sends before it is dropped, or
+            None to keep going.
+        stall (bool): Keep a stream's connection open, silent, after stream_parts
+            instead of closing it.
+    """
+
+    def __init__(self) -> None:
+        self.body = make_jpeg()
+        self.bodies: Dict[str, Optional[bytes]] = {}
+        self.delays: Dict[str, float] = {}
+        self.delay = 0.0
+        self.etags: Dict[str, str] = {}
+        self.requests: Counter = Counter()
+        self.changing = False
+        self.streams: Dict[str, float] = {}
+        self.stream_parts: Optional[int] = None
+        self.stall = False
+        self.stopped = threading.Event()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), CameraHandler)
+        self._server.daemon_threads = True
+        self._server.camera = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def url(self, path: str = "/output.jpg") -> str:
+        return f"{self.base_url}{path}"
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class CameraHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        camera: CameraServer = self.server.camera
+        camera.requests[self.path] += 1
+        delay = camera.delays.get(self.path, camera.delay)
+        if delay:
+            time.sleep(delay)
+        if self.path in camera.streams:
+            self.send_stream(camera, camera.streams[self.path])
+            return
+        body = camera.bodies.get(self.path, camera.body)
+        if camera.changing:
+            body = make_jpeg(value=camera.requests[self.path] * 16 % 256)
+        if body is None:
+            self.send_error(404)
+            return
+        etag = camera.etags.get(self.path)
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_stream(self, camera: CameraServer, fps: float) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        part = 0
+        try:
+            while not camera.stopped.is_set():
+                if camera.stream_parts is not None and part >= camera.stream_parts:
+                    if camera.stall:
+                        camera.stopped.wait()
+                    return
+                body = make_jpeg(value=part * 16 % 256)
+                self.wfile.write(
+                    b"--frame\r\nContent-Type: image/jpeg\r\n"
+                    b"Content-Length: %d\r\n\r\n%s\r\n" % (len(body), body)
+                )
+                self.wfile.flush()
+                part += 1
+                time.sleep(1 / fps)
+        except OSError:
+            # The client went away
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def camera_server(request):
+    """A running CameraServer, configured from the test's parameters if it is
+    parametrised indirectly with a dict of attributes."""
+    server = CameraServer()
+    for name, value in getattr(request, "param", {}).items():
+        setattr(server, name, value)
+    server.start()
+    yield server
+    server.stop()
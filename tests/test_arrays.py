@@ -0,0 +1,60 @@
+import gc
+
+import numpy as np
+import pytest
+from qtpy.QtCore import Qt
+from qtpy.QtGui import QColor, QPainter
+
+from qmicroscope.utils import arrays
+from qmicroscope.utils.arrays import array_to_qimage
+
+
+def test_bgr_array_is_not_copied():
+    array = np.zeros((48, 64, 3), dtype=np.uint8)
+    array[..., 0] = 255  # blue in OpenCV's BGR order
+    address = array.ctypes.data
+    image = array_to_qimage(array)
+    del array
+    gc.collect()
+    assert int(image.constBits()) == address
+    assert (image.width(), image.height()) == (64, 48)
+    assert QColor(image.pixel(10, 10)).getRgb()[:3] == (0, 0, 255)
+
+
+def test_painting_copies_the_pixels():
+    array = np.zeros((10, 10, 3), dtype=np.uint8)
+    image = array_to_qimage(array)
+    painter = QPainter(image)
+    painter.fillRect(0, 0, 10, 10, Qt.white)
+    painter.end()
+    assert QColor(image.pixel(5, 5)).getRgb()[:3] == (255, 255, 255)
+    assert not array.any()
+
+
+def test_grayscale_and_views():
+    gray = array_to_qimage(np.full((10, 20), 128, dtype=np.uint8))
+    assert QColor(gray.pixel(0, 0)).getRgb()[:3] == (128, 128, 128)
+    # A crop of rows shares memory, a crop of columns has to be copied
+    array = np.zeros((40, 40, 3), dtype=np.uint8)
+    assert int(array_to_qimage(array[10:20]).constBits()) == array[10:20].ctypes.data
+    assert array_to_qimage(array[:, 10:20]).width() == 10
+
+
+def test_unsupported_arrays():
+    with pytest.raises(ValueError):
+        array_to_qimage(np.zeros((4, 4, 3), dtype=np.float32))
+    with pytest.raises(ValueError):
+        array_to_qimage(np.zeros((4, 4, 2), dtype=np.uint8))
+
+
+def test_rgb_fallback_leaves_array_alone(monkeypatch):
+    # Qt older than 5.14 has no BGR888 format
+    monkeypatch.setattr(arrays, "_FORMAT_BGR888", None)
+    array = np.zeros((48, 64, 3), dtype=np.uint8)
+    array[..., 0] = 255
+    original = array.copy()
+    for _ in range(2):
+        image = array_to_qimage(array)
+        assert QColor(image.pixel(10, 10)).getRgb()[:3] == (0, 0, 255)
+    assert np.array_equal(array, original)
+    
\ No newline at end of file
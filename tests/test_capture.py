@@ -0,0 +1,78 @@
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from qmicroscope.widgets.capture import CaptureReader
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    path = str(tmp_path / "feed.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for value in range(20):
+        writer.write(np.full((48, 64, 3), value * 10, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_live_reader_decodes_only_requested_frames(video_file):
+    frames = []
+    received = threading.Event()
+
+    def on_frame(frame, grabbed):
+        frames.append((frame.shape, grabbed))
+        received.set()
+
+    # Read like a live feed, drained as fast as it comes
+    reader = CaptureReader(video_file, on_frame, live=True)
+    reader.request()
+    reader.start()
+    assert received.wait(5)
+    reader.join(5)
+    assert not reader.running
+    # The whole file was grabbed, but only one frame decoded
+    assert reader.grabbed == 20
+    assert reader.retrieved == 1
+    assert frames[0][0] == (48, 64, 3)
+    assert reader.error
+
+
+def test_file_is_read_one_frame_per_request(video_file):
+    values = []
+    received = threading.Semaphore(0)
+
+    def on_frame(frame, grabbed):
+        values.append(int(frame[0, 0, 0]))
+        received.release()
+
+    reader = CaptureReader(video_file, on_frame)
+    reader.start()
+    try:
+        reader.request()
+        assert received.acquire(timeout=5)
+        assert not reader.live
+        # Nothing more is read until the next request
+        assert not received.acquire(timeout=0.2)
+        assert reader.grabbed == 1
+        # Playing on past the end starts over
+        for _ in range(24):
+            reader.request()
+            assert received.acquire(timeout=5)
+    finally:
+        reader.stop()
+        reader.join(5)
+    assert not reader.running
+    assert not reader.error
+    assert reader.retrieved == 25
+    # Each frame is ten grey levels brighter, give or take compression
+    assert abs(values[1] - values[0] - 10) <= 3
+    assert abs(values[20] - values[0]) <= 3
+
+
+def test_reader_reports_open_errors(tmp_path):
+    reader = CaptureReader(str(tmp_path / "missing.avi"), lambda *args: None)
+    reader.start()
+    reader.join(5)
+    assert reader.error.startswith("could not open")
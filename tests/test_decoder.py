@@ -0,0 +1,76 @@
+import threading
+
+import cv2
+import numpy as np
+
+from qmicroscope.utils.decoder import (
+    DecodePool,
+    FrameDecoder,
+    decode_jpeg,
+    reduction_factor,
+)
+
+
+def encode(width, height, value=0):
+    frame = np.full((height, width, 3), value, dtype=np.uint8)
+    return cv2.imencode(".jpg", frame)[1].tobytes()
+
+
+def test_decode_jpeg():
+    image = decode_jpeg(encode(64, 48))
+    assert (image.width(), image.height()) == (64, 48)
+    assert decode_jpeg(b"not an image").isNull()
+
+
+def test_frames_delivered_in_order():
+    received = []
+    sequences = []
+    done = threading.Event()
+    sizes = [(640, 480), (16, 16), (320, 240), (8, 8)]
+
+    def callback(frame):
+        received.append((frame.image.width(), frame.image.height()))
+        sequences.append(frame.sequence)
+        if len(received) == len(sizes):
+            done.set()
+
+    decoder = FrameDecoder(callback, pool=DecodePool(4), max_pending=len(sizes))
+    for width, height in sizes:
+        decoder.submit(encode(width, height))
+    assert done.wait(5)
+    assert received == sizes
+    assert sequences == [1, 2, 3, 4]
+    assert decoder.dropped == 0
+
+
+def test_reduction_factor():
+    assert reduction_factor((1920, 1080), None) == 1
+    assert reduction_factor(None, (200, 0)) == 1
+    assert reduction_factor((1920, 1080), (200, 0)) == 8
+    assert reduction_factor((1920, 1080), (0, 500)) == 2
+    assert reduction_factor((1920, 1080), (1280, 0)) == 1
+
+
+def test_reduced_decode():
+    image = decode_jpeg(encode(640, 480), 4)
+    assert (image.width(), image.height()) == (160, 120)
+
+
+def test_decoder_reduces_to_target_size():
+    received = []
+    done = threading.Event()
+
+    def callback(frame):
+        received.append((frame.image.width(), frame.image.height(), frame.reduction))
+        done.set()
+
+    decoder = FrameDecoder(callback, pool=DecodePool(1))
+    decoder.target_size = (150, 0)
+    # The first frame is full size, as the camera resolution isn't known yet
+    for expected in [(640, 480, 1), (160, 120, 4)]:
+        done.clear()
+        decoder.submit(encode(640, 480))
+        assert done.wait(5)
+        assert received[-1] == expected
+    assert decoder.full_size == (640, 480)
+    assert decoder.reduction == 4
@@ -0,0 +1,28 @@
+import time
+
+from qmicroscope.widgets.display import DisplayScheduler
+
+
+class FakeMicroscope:
+    def __init__(self):
+        self.taken = []
+
+    def takeFrame(self):
+        self.taken.append(time.monotonic())
+
+
+def test_frames_shown_in_one_pass_per_tick(qtbot):
+    scheduler = DisplayScheduler(max_hz=10)
+    microscopes = [FakeMicroscope() for _ in range(4)]
+    for _ in range(3):
+        for microscope in microscopes:
+            scheduler.schedule(microscope)
+    assert scheduler.pending == 4
+    qtbot.waitUntil(lambda: scheduler.ticks == 1)
+    assert [len(m.taken) for m in microscopes] == [1, 1, 1, 1]
+
+    # The next pass waits for the next tick
+    scheduler.schedule(microscopes[0])
+    qtbot.waitUntil(lambda: scheduler.ticks == 2)
+    assert microscopes[0].taken[1] - microscopes[0].taken[0] >= 0.09
+    assert scheduler.frames == 5
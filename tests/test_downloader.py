@@ -0,0 +1,151 @@
+import http.client
+import threading
+import time
+import urllib.error
+
+import pytest
+
+from qtpy.QtCore import Qt
+
+from conftest import make_jpeg
+
+from qmicroscope.widgets.downloader import (
+    MODE_JPEG,
+    ConnectionPool,
+    VideoThread,
+    split_url,
+)
+from qmicroscope.widgets.engine import AcquisitionEngine
+
+
+BODY = b"\xff\xd8not really a jpeg\xff\xd9"
+ETAG = '"frame-1"'
+
+
+@pytest.fixture
+def camera_url(camera_server):
+    camera_server.body = BODY
+    camera_server.delays["/hang.jpg"] = 2
+    camera_server.bodies["/missing.jpg"] = None
+    camera_server.etags["/etag.jpg"] = ETAG
+    return camera_server.base_url
+
+
+def test_fetch_reuses_connection(camera_url):
+    pool = ConnectionPool()
+    url = f"{camera_url}/output.jpg"
+    for _ in range(5):
+        result = pool.fetch(url, timeout=2)
+        assert result.status == 200
+        assert result.body == BODY
+    stats = pool.stats(url)
+    assert stats.requests == 5
+    assert stats.opened == 1
+    assert stats.reused == 4
+    assert stats.mean_latency > 0
+    pool.clear()
+
+
+def test_fetch_error_status(camera_url):
+    pool = ConnectionPool()
+    with pytest.raises(urllib.error.HTTPError):
+        pool.fetch(f"{camera_url}/missing.jpg", timeout=2)
+    pool.clear()
+
+
+def test_fetch_deadline(camera_url):
+    pool = ConnectionPool()
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        pool.fetch(f"{camera_url}/hang.jpg", timeout=0.2)
+    assert time.monotonic() - start < 1
+    assert pool.stats(f"{camera_url}/hang.jpg").errors == 1
+
+
+def test_retry_keeps_to_the_deadline(camera_url, mocker):
+    pool = ConnectionPool()
+    url = f"{camera_url}/output.jpg"
+    key = split_url(url)[0]
+
+    class StaleConnection:
+        """An idle connection the camera has closed, found out slowly."""
+
+        sock = None
+        timeout = None
+
+        def request(self, *args, **kwargs):
+            time.sleep(0.3)
+            raise ConnectionResetError
+
+        def close(self):
+            pass
+
+    pool._idle[key].append(StaleConnection())
+    connect = mocker.spy(http.client.HTTPConnection, "connect")
+    result = pool.fetch(url, timeout=0.5)
+    assert result.body == BODY
+    # The new connection only gets what is left of the deadline
+    assert connect.call_count == 1
+    assert connect.call_args.args[0].timeout <= 0.2
+    pool.clear()
+
+
+def test_cancel_in_flight_fetch(camera_url):
+    pool = ConnectionPool()
+    url = f"{camera_url}/hang.jpg"
+    threading.Timer(0.2, pool.cancel, args=(url,)).start()
+    start = time.monotonic()
+    with pytest.raises(OSError):
+        pool.fetch(url, timeout=10)
+    assert time.monotonic() - start < 1
+
+
+@pytest.mark.parametrize("path", ["/output.jpg", "/etag.jpg"])
+def test_unchanged_frames_skipped(qtbot, camera_url, path):
+    frames = []
+    thread = VideoThread(url=f"{camera_url}{path}")
+    thread.imageReady.connect(frames.append, Qt.DirectConnection)
+    thread.mode = MODE_JPEG
+    for _ in range(3):
+        thread.camera_refresh()
+    qtbot.waitUntil(lambda: len(frames) == 1)
+    assert thread.unchanged_frames == 2
+    if path == "/etag.jpg":
+        assert thread.validators == {"If-None-Match": ETAG}
+
+    # A refresh, e.g. for a new subscriber, delivers the frame again
+    thread.refresh()
+    thread.camera_refresh()
+    qtbot.waitUntil(lambda: len(frames) == 2)
+
+
+@pytest.mark.parametrize("engine", [False, True])
+def test_slow_camera_still_delivers(qtbot, camera_server, engine):
+    # Answers in 150 ms, well over the frame period at 30 fps
+    camera_server.body = make_jpeg()
+    camera_server.delay = 0.15
+    frames = []
+    errors = []
+    thread = VideoThread(fps=30, url=camera_server.url())
+    thread.imageReady.connect(
+        lambda frame: (errors if thread.showing_error else frames).append(frame),
+        Qt.DirectConnection,
+    )
+    acquisition = AcquisitionEngine() if engine else None
+    if acquisition:
+        acquisition.add(thread)
+    else:
+        thread.start()
+    try:
+        qtbot.waitUntil(lambda: len(frames) == 1, timeout=3000)
+        qtbot.wait(1000)
+    finally:
+        if acquisition:
+            acquisition.remove(thread)
+            acquisition.stop()
+        else:
+            thread.stop()
+            thread.wait(2000)
+    assert not errors
+    # The same JPEG every time, the rest were unchanged frames
+    assert thread.unchanged_frames >= 4
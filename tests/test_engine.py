@@ -0,0 +1,33 @@
+import pytest
+from qtpy.QtCore import Qt
+
+from qmicroscope.widgets.downloader import VideoThread
+from qmicroscope.widgets.engine import AcquisitionEngine
+
+
+@pytest.fixture
+def camera_url(camera_server):
+    return camera_server.url()
+
+
+def test_engine_acquires_cameras(qtbot, camera_url):
+    engine = AcquisitionEngine(max_concurrency=2)
+    cameras = [VideoThread(fps=20, url=camera_url) for _ in range(4)]
+    counts = [0] * len(cameras)
+    for i, camera in enumerate(cameras):
+        camera.imageReady.connect(
+            lambda image, i=i: counts.__setitem__(i, counts[i] + 1),
+            Qt.DirectConnection,
+        )
+        engine.add(camera)
+
+    # The camera serves the same JPEG every time, so it is only emitted once
+    qtbot.waitUntil(
+        lambda: min(camera.unchanged_frames for camera in cameras) >= 2, timeout=5000
+    )
+    qtbot.waitUntil(lambda: counts == [1] * len(cameras))
+    assert not any(camera.isRunning() for camera in cameras)
+    for camera in cameras:
+        engine.remove(camera)
+    engine.stop()
+    assert not engine.running
@@ -0,0 +1,26 @@
+import time
+
+from qmicroscope.utils.frame import Frame
+
+
+def test_stage_timings():
+    frame = Frame(timestamp=time.monotonic() - 0.5, source="http://camera/output.jpg")
+    frame.time_stage("fetch", frame.timestamp - 0.1)
+    assert frame.timings["fetch"] >= 0.6
+    frame.mark("decode")
+    assert 0 <= frame.timings["decode"] < 0.5
+    assert frame.age >= 0.5
+    assert abs(frame.wall_time - (time.time() - frame.age)) < 0.01
+
+
+def test_copy_is_independent():
+    frame = Frame(source="http://camera/output.jpg")
+    frame.sequence = 7
+    frame.mark("decode")
+    copy = frame.copy()
+    copy.mark("plugins")
+    copy.image = "changed"
+    assert copy.sequence == 7
+    assert copy.timings.keys() == {"decode", "plugins"}
+    assert frame.timings.keys() == {"decode"}
+    assert frame.image is None
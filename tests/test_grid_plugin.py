@@ -0,0 +1,51 @@
+from qtpy.QtCore import QPoint
+from qtpy.QtGui import QColor
+
+from qmicroscope.microscope import Microscope
+from qmicroscope.plugins.grid_plugin import GridPlugin
+
+
+def test_grid_is_one_cached_path(qtbot, mocker):
+    microscope = Microscope(plugins=[GridPlugin])
+    qtbot.addWidget(microscope)
+    plugin = microscope.plugins["GridPlugin"]
+    scene = microscope.scene
+    items = len(scene.items())
+
+    plugin._x_divs = plugin._y_divs = 200
+    plugin.update_grid(QPoint(0, 0), QPoint(400, 300))
+    grid = plugin._grid
+    assert len(scene.items()) == items + 1
+    # The rectangle is 5 elements, each division a moveTo and a lineTo
+    assert grid.path().elementCount() == 5 + 2 * 199 * 2
+
+    set_path = mocker.spy(grid, "setPath")
+    plugin.update_grid(QPoint(0, 0), QPoint(400, 300))
+    assert set_path.call_count == 0
+
+    plugin.update_grid(QPoint(10, 10), QPoint(400, 300))
+    plugin._grid_color = QColor.fromRgb(255, 0, 0)
+    plugin.paintBoxes(scene)
+    assert set_path.call_count == 2
+    assert plugin._grid is grid
+    assert grid.pen().color() == QColor.fromRgb(255, 0, 0)
+    assert len(scene.items()) == items + 1
+
+    plugin.remove_grid(scene)
+    assert len(scene.items()) == items
+    assert plugin._grid is None
+
+
+def test_detached_grid_is_replaced(qtbot):
+    microscope = Microscope(plugins=[GridPlugin])
+    qtbot.addWidget(microscope)
+    plugin = microscope.plugins["GridPlugin"]
+    scene = microscope.scene
+    plugin.update_grid(QPoint(0, 0), QPoint(400, 300))
+    grid = plugin._grid
+    scene.removeItem(grid)
+
+    plugin.paintBoxes(scene)
+    assert plugin._grid is not grid
+    assert plugin._grid.scene() is scene
+    assert plugin._grid.path().elementCount() > 0
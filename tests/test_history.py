@@ -0,0 +1,67 @@
+import cv2
+import numpy as np
+
+from qmicroscope.utils.history import FrameHistory
+
+
+def encode(value):
+    frame = np.full((24, 32, 3), value, dtype=np.uint8)
+    return cv2.imencode(".jpg", frame)[1].tobytes()
+
+
+def test_keeps_last_seconds():
+    history = FrameHistory(seconds=2.0)
+    for i in range(30):
+        history.append(i * 0.5, encode(i))
+    assert history.span == (12.5, 14.5)
+    assert len(history) == 5
+
+
+def test_memory_budget():
+    frame = np.zeros((24, 32, 3), dtype=np.uint8)
+    history = FrameHistory(seconds=100, max_bytes=frame.nbytes * 3)
+    for i in range(10):
+        history.append(float(i), frame)
+    assert len(history) == 3
+    assert history.nbytes == frame.nbytes * 3
+
+
+def test_lookup_by_time():
+    history = FrameHistory(seconds=10, source="http://camera/output.jpg")
+    for i in range(10):
+        history.append(float(i), encode(i * 20))
+    assert history.frame_at(-1) is None
+    frame = history.frame_at(4.5)
+    assert frame.timestamp == 4.0
+    assert frame.source == "http://camera/output.jpg"
+    assert (frame.image.width(), frame.image.height()) == (32, 24)
+    frames = history.frames_between(2, 5)
+    assert [f.timestamp for f in frames] == [2.0, 3.0, 4.0, 5.0]
+
+
+def test_lookup_after_dropping_frames():
+    history = FrameHistory(seconds=10)
+    for i in range(100):
+        history.append(float(i), b"frame %d" % i)
+        # Dropped frames don't pile up
+        assert len(history._timestamps) <= 2 * len(history) + 1
+    assert history.span == (89.0, 99.0)
+    assert history.frame_at(88.5) is None
+    assert history.entries_between(0, 90.5) == [
+        (89.0, b"frame 89"),
+        (90.0, b"frame 90"),
+    ]
+    assert [t for t, _ in history.entries_between(95, 200)] == [95, 96, 97, 98, 99]
+
+
+def test_export(tmp_path):
+    history = FrameHistory(seconds=10)
+    for i in range(5):
+        history.append(float(i), encode(i * 40))
+    history.append(5.0, np.zeros((24, 32, 3), dtype=np.uint8))
+    assert history.export(tmp_path / "frames", 1, 5) == 5
+    assert len(list((tmp_path / "frames").glob("*.jpg"))) == 5
+    assert history.export(tmp_path / "clip.avi", 0, 5) == 6
+    capture = cv2.VideoCapture(str(tmp_path / "clip.avi"))
+    assert capture.get(cv2.CAP_PROP_FRAME_COUNT) == 6
+    capture.release()
@@ -0,0 +1,17 @@
+from qmicroscope.utils.mailbox import FrameMailbox
+
+
+def test_latest_frame_wins():
+    mailbox = FrameMailbox()
+    notifications = []
+    mailbox.frameReady.connect(lambda: notifications.append(True))
+
+    for frame in range(5):
+        mailbox.put(frame)
+    assert len(notifications) == 1
+    assert mailbox.take() == 4
+    assert mailbox.take() is None
+    assert (mailbox.delivered, mailbox.dropped) == (1, 4)
+
+    mailbox.put(5)
+    assert len(notifications) == 2
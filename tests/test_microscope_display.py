@@ -0,0 +1,53 @@
+import pytest
+from qtpy.QtCore import QPoint, QPointF, QSize
+from qtpy.QtGui import QImage
+
+from qmicroscope.microscope import Microscope
+from qmicroscope.utils.frame import Frame
+
+
+@pytest.fixture
+def microscope(qtbot):
+    microscope = Microscope()
+    qtbot.addWidget(microscope)
+    microscope.scale = [200, 0]
+    return microscope
+
+
+def frame(width=640, height=480):
+    image = QImage(width, height, QImage.Format_RGB888)
+    image.fill(0)
+    return Frame(image)
+
+
+@pytest.mark.parametrize("direct_paint", [True, False])
+@pytest.mark.parametrize("scale_in_view", [True, False])
+def test_scaled_display(microscope, scale_in_view, direct_paint):
+    microscope.scale_in_view = scale_in_view
+    microscope.direct_paint = direct_paint
+    microscope.updateImageData(frame())
+    assert microscope.displayItem.isVisible()
+    assert microscope.imageItem.isVisible() == direct_paint
+    assert microscope.displaySize() == QSize(200, 150)
+    assert microscope.minimumSize() == QSize(200, 150)
+    # The frame is only resampled if it isn't scaled by the view
+    assert microscope.image.width() == (640 if scale_in_view else 200)
+
+    # Ten view pixels are 32 frame pixels, either way
+    start = microscope.mapToFrame(QPoint(10, 10))
+    end = microscope.mapToFrame(QPoint(20, 10))
+    assert end.x() - start.x() == pytest.approx(32)
+    assert microscope.mapFromFrame(end) == QPointF(20, 10)
+
+
+def test_geometry_only_redone_on_size_change(microscope, mocker):
+    fit = mocker.spy(microscope, "fitToFrame")
+    microscope.updateImageData(frame())
+    microscope.updateImageData(frame())
+    assert fit.call_count == 1
+    microscope.updateImageData(frame(320, 240))
+    assert fit.call_count == 1  # Still 200x150 on screen
+    microscope.scale = [0, 300]
+    microscope.updateImageData(frame(320, 240))
+    assert fit.call_count == 2
+    assert microscope.displaySize() == QSize(400, 300)
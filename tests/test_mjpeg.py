@@ -0,0 +1,118 @@
+import pytest
+from qtpy.QtCore import Qt
+
+from qmicroscope.utils.mjpeg import MultipartParser, boundary_from_content_type
+from qmicroscope.widgets.downloader import MODE_MJPEG, VideoThread
+from qmicroscope.widgets.engine import AcquisitionEngine
+
+FRAMES = [b"\xff\xd8first\xff\xd9", b"\xff\xd8second frame\r\n--\xff\xd9", b""]
+
+
+def make_stream(boundary=b"myboundary", content_length=True):
+    stream = b""
+    for frame in FRAMES:
+        stream += b"--" + boundary + b"\r\nContent-Type: image/jpeg\r\n"
+        if content_length:
+            stream += b"Content-Length: %d\r\n" % len(frame)
+        stream += b"\r\n" + frame + b"\r\n"
+    # A trailing delimiter completes the last part when there is no length
+    return stream + b"--" + boundary + b"\r\n"
+
+
+def test_boundary_from_content_type():
+    assert boundary_from_content_type(
+        "multipart/x-mixed-replace; boundary=myboundary"
+    ) == b"myboundary"
+    assert boundary_from_content_type(
+        'multipart/x-mixed-replace;boundary="--myboundary"'
+    ) == b"myboundary"
+    assert boundary_from_content_type("image/jpeg") is None
+
+
+@pytest.mark.parametrize("content_length", [True, False])
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_parser_chunked_feed(content_length, chunk_size):
+    stream = make_stream(content_length=content_length)
+    parser = MultipartParser(b"myboundary")
+    payloads = []
+    for i in range(0, len(stream), chunk_size):
+        payloads.extend(parser.feed(stream[i : i + chunk_size]))
+    assert payloads == FRAMES
+    assert parser.parts == len(FRAMES)
+
+
+def test_parser_resynchronises_after_garbage():
+    parser = MultipartParser(b"myboundary")
+    assert parser.feed(b"garbage before the first boundary") == []
+    assert parser.feed(make_stream()) == FRAMES
+    assert parser.discarded > 0
+
+
+def acquire(camera, engine):
+    """Start acquiring on a thread of its own or an engine, returns a function that
+    stops it."""
+    if engine:
+        acquisition = AcquisitionEngine()
+        acquisition.add(camera)
+
+        def stop():
+            acquisition.remove(camera)
+            acquisition.stop()
+
+    else:
+        camera.start()
+
+        def stop():
+            camera.stop()
+            camera.wait(2000)
+
+    return stop
+
+
+@pytest.fixture
+def stream_url(camera_server):
+    camera_server.streams["/stream.mjpg"] = 30
+    return camera_server.url("/stream.mjpg")
+
+
+@pytest.mark.parametrize("engine", [False, True])
+def test_stream_delivers_at_requested_rate(qtbot, stream_url, engine):
+    frames = []
+    camera = VideoThread(fps=10, url=stream_url)
+    camera.imageReady.connect(frames.append, Qt.DirectConnection)
+    stop = acquire(camera, engine)
+    try:
+        # The Content-Type tells a stream from a single JPEG
+        qtbot.waitUntil(lambda: len(frames) >= 1, timeout=3000)
+        assert camera.mode == MODE_MJPEG
+        first = len(frames)
+        qtbot.wait(1000)
+    finally:
+        stop()
+    assert not camera.showing_error
+    assert 6 <= len(frames) - first <= 12
+    # The camera sends 30 parts a second, most aren't worth decoding
+    assert camera.skipped_parts > len(frames)
+
+
+@pytest.mark.parametrize("stall", [False, True])
+@pytest.mark.parametrize("engine", [False, True])
+def test_dropped_stream_reconnects(qtbot, camera_server, stream_url, engine, stall):
+    camera_server.stream_parts = 5
+    camera_server.stall = stall
+    frames = []
+    camera = VideoThread(fps=30, url=stream_url)
+    camera.imageReady.connect(
+        lambda frame: camera.showing_error or frames.append(frame),
+        Qt.DirectConnection,
+    )
+    # A silent stream is given up on after stream_timeout
+    camera.stream_timeout = camera.min_timeout = 0.3
+    stop = acquire(camera, engine)
+    try:
+        qtbot.waitUntil(
+            lambda: camera_server.requests["/stream.mjpg"] >= 3, timeout=5000
+        )
+        qtbot.waitUntil(lambda: len(frames) >= 10)
+    finally:
+        stop()
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+from conftest import make_jpeg
+
+from qmicroscope.microscope import Microscope
+from qmicroscope.plugins.mousewheel_camera_zoom import MouseWheelCameraZoomPlugin
+from qmicroscope.widgets.downloader import VideoThread
+from qmicroscope.widgets.sources import source_registry
+
+
+@pytest.fixture
+def zoom_urls(camera_server):
+    # Every zoom level has an image of its own size
+    urls = []
+    for level in (1, 2, 3):
+        camera_server.bodies[f"/{level}.jpg"] = make_jpeg(16 * level, 16 * level)
+        urls.append(camera_server.url(f"/{level}.jpg"))
+    return urls
+
+
+def test_neighbouring_zoom_levels_are_prewarmed(qtbot, zoom_urls):
+    microscope = Microscope(plugins=[MouseWheelCameraZoomPlugin])
+    qtbot.addWidget(microscope)
+    plugin = microscope.plugins["MouseWheelCameraZoomPlugin"]
+    plugin.urls = zoom_urls
+    microscope.url = zoom_urls[0]
+    microscope.acquire(True)
+    try:
+        assert source_registry.source(zoom_urls[1]).running
+        assert not source_registry.source(zoom_urls[2]).running
+        qtbot.waitUntil(lambda: microscope.image.width() == 16)
+
+        plugin.set_zoom_level(1)
+        assert microscope.source.url == zoom_urls[1]
+        # The prewarmed frame is shown without waiting for a new fetch
+        qtbot.waitUntil(lambda: microscope.image.width() == 32, timeout=500)
+        assert source_registry.source(zoom_urls[0]).running
+        assert source_registry.source(zoom_urls[2]).running
+        assert source_registry.source(zoom_urls[1]).subscribers == 1
+    finally:
+        microscope.acquire(False)
+    for url in zoom_urls:
+        assert source_registry.source(url).subscribers == 0
+
+
+def test_zooming_does_not_wait_for_cooled_levels(
+    qtbot, mocker, camera_server, zoom_urls
+):
+    # Fetches that can't be cut short, so a zoom level being cooled usually takes
+    # a while to stop
+    camera_refresh = VideoThread.camera_refresh
+
+    def slow_refresh(thread):
+        time.sleep(0.5)
+        camera_refresh(thread)
+
+    mocker.patch.object(VideoThread, "camera_refresh", slow_refresh)
+    microscope = Microscope(plugins=[MouseWheelCameraZoomPlugin])
+    qtbot.addWidget(microscope)
+    plugin = microscope.plugins["MouseWheelCameraZoomPlugin"]
+    plugin.urls = zoom_urls
+    microscope.url = zoom_urls[0]
+    microscope.fps = 20
+    microscope.acquire(True)
+    try:
+        qtbot.waitUntil(lambda: microscope.image.width() == 16)
+        for level in (1, 2, 1, 0):
+            start = time.monotonic()
+            plugin.set_zoom_level(level)
+            assert time.monotonic() - start < 0.05
+            qtbot.wait(100)
+
+        # The level cooled on the way up and warmed again on the way down works
+        assert microscope.source.url == zoom_urls[0]
+        requests = camera_server.requests["/1.jpg"]
+        qtbot.waitUntil(lambda: camera_server.requests["/1.jpg"] >= requests + 3)
+        assert source_registry.source(zoom_urls[1]).running
+        assert not source_registry.source(zoom_urls[2]).running
+    finally:
+        microscope.acquire(False)
@@ -0,0 +1,100 @@
+import time
+
+from qtpy.QtGui import QImage
+
+from qmicroscope.microscope import Microscope
+from qmicroscope.plugins.base_plugin import BaseImagePlugin, BasePlugin
+from qmicroscope.plugins.timing_plugin import PluginTimingPlugin
+from qmicroscope.utils.frame import Frame
+from qmicroscope.utils.pipeline import FramePipeline
+from qmicroscope.utils.rolling import RollingWindow
+
+
+class InvertPlugin(BaseImagePlugin):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.name = "Invert"
+
+    def update_image_data(self, image):
+        image = image.copy()
+        image.invertPixels()
+        return image
+
+
+class SlowPlugin(BaseImagePlugin):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.name = "Slow"
+
+    def update_frame(self, frame):
+        time.sleep(0.005)
+        return frame
+
+
+class NoOpPlugin(BaseImagePlugin):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.name = "NoOp"
+
+
+def test_rolling_window():
+    window = RollingWindow(4)
+    assert window.mean == 0.0 and len(window) == 0
+    for value in range(1, 7):
+        window.add(float(value))
+    assert len(window) == 4 and window.count == 6
+    assert window.last == 6.0
+    assert list(window.values()) == [3.0, 4.0, 5.0, 6.0]
+    assert window.mean == 4.5
+    assert window.max == 6.0
+
+
+def test_pipeline_skips_plugins_that_leave_frames_alone():
+    plugins = [InvertPlugin(), NoOpPlugin(), BasePlugin(), SlowPlugin()]
+    pipeline = FramePipeline(plugins)
+    assert [stage.name for stage in pipeline] == ["Invert", "Slow"]
+    assert pipeline.full_resolution
+
+    assert not FramePipeline([BasePlugin()]).full_resolution
+    assert FramePipeline([NoOpPlugin()]).full_resolution
+
+
+def test_pipeline_times_stages():
+    image = QImage(4, 4, QImage.Format_RGB32)
+    image.fill(0)
+    pipeline = FramePipeline([InvertPlugin(), SlowPlugin()])
+    for _ in range(3):
+        frame = pipeline.run(Frame(image))
+    assert frame.image.pixel(0, 0) != image.pixel(0, 0)
+
+    timings = pipeline.timings()
+    assert timings["Slow"]["count"] == 3
+    assert timings["Slow"]["last"] >= 0.005
+    assert timings["Slow"]["p99"] >= timings["Slow"]["mean"] >= 0.005
+    assert timings["Invert"]["mean"] < timings["Slow"]["mean"]
+
+    # Rebuilding keeps the timings of the plugins still in the pipeline
+    rebuilt = FramePipeline([SlowPlugin()], previous=pipeline)
+    assert rebuilt.timings()["Slow"]["count"] == 3
+
+
+def test_microscope_rebuilds_pipeline_when_plugins_change(qtbot):
+    microscope = Microscope(plugins=[InvertPlugin, PluginTimingPlugin])
+    qtbot.addWidget(microscope)
+    assert [stage.name for stage in microscope.pipeline] == ["Invert"]
+    pipeline = microscope.pipeline
+
+    image = QImage(8, 8, QImage.Format_RGB32)
+    image.fill(0)
+    microscope.updateImageData(image)
+    microscope.updateImageData(image)
+    assert microscope.pipeline is pipeline
+    assert microscope.pluginTimings()["Invert"]["count"] == 2
+
+    microscope.plugins["InvertPlugin"].updates_image = False
+    microscope.pluginsChanged()
+    assert len(microscope.pipeline) == 0
+    assert microscope.pluginTimings() == {}
+
+    overlay = microscope.plugins["PluginTimingPlugin"]
+    assert overlay.overlay_text() == "No plugins process frames"
@@ -0,0 +1,102 @@
+import pytest
+from qtpy.QtCore import QSize, Qt
+from qtpy.QtGui import QImage
+from qtpy.QtWidgets import QTabWidget, QWidget
+
+from qmicroscope.container import Container
+from qmicroscope.microscope import Microscope
+from qmicroscope.utils.frame import Frame
+from qmicroscope.widgets.qos import BACKGROUND, FOCUSED, THUMBNAIL, QosTier
+
+
+def test_container_assigns_tiers(qtbot):
+    container = Container(qos=True)
+    qtbot.addWidget(container)
+    container.count = 3
+    container.updateWidgets()
+    microscopes = [container.microscope(i) for i in range(3)]
+    for i, m in enumerate(microscopes):
+        m.settings_group = f"Camera{i}"
+        m.fps = 30
+        m.scale = [640, 480]
+    container.updateTiers()
+    assert [container.tier(m) for m in microscopes] == [THUMBNAIL] * 3
+    assert microscopes[0].acquisitionFps() == 5
+    assert microscopes[0].decodeSize() == (320, 0)
+
+    # Clicking a microscope focuses it
+    microscopes[1].clicked_url.emit("Camera1")
+    assert container.focused is microscopes[1]
+    assert container.tier(microscopes[1]) == FOCUSED
+    assert microscopes[1].acquisitionFps() == 30
+    assert microscopes[1].decodeSize() == (640, 0)
+    assert microscopes[0].acquisitionFps() == 5
+
+    container.setFocused("Camera2")
+    assert container.tier(microscopes[1]) == THUMBNAIL
+    assert microscopes[2].acquisitionFps() == 30
+
+    # Microscopes that can't be seen go in the background
+    container.show()
+    qtbot.waitExposed(container)
+    container.hide()
+    assert container.tier(microscopes[0]) == BACKGROUND
+    assert microscopes[0].acquisitionFps() == 0
+    assert microscopes[0].decodeSize() == (160, 0)
+
+    container.tiers[BACKGROUND] = QosTier(fps=1)
+    container.updateTiers()
+    assert microscopes[0].acquisitionFps() == 1
+
+
+def test_container_without_qos(qtbot):
+    container = Container()
+    qtbot.addWidget(container)
+    microscope = container.microscope(0)
+    microscope.fps = 30
+    assert microscope.qos is None
+    assert microscope.acquisitionFps() == 30
+
+
+def test_container_in_unopened_tab_is_background(qtbot):
+    tabs = QTabWidget()
+    qtbot.addWidget(tabs)
+    tabs.addTab(QWidget(), "First")
+    container = Container(qos=True)
+    tabs.addTab(container, "Second")
+    container.count = 1
+    container.updateWidgets()
+    microscope = container.microscope(0)
+    microscope.fps = 30
+    tabs.show()
+    qtbot.waitExposed(tabs)
+    container.start(True)
+    try:
+        assert container.tier(microscope) == BACKGROUND
+        assert microscope.acquisitionFps() == 0
+
+        tabs.setCurrentIndex(1)
+        assert container.tier(microscope) == THUMBNAIL
+        assert microscope.acquisitionFps() == 5
+    finally:
+        container.start(False)
+
+
+@pytest.mark.parametrize("scale_in_view", [True, False])
+def test_qos_only_reduces_decoding(qtbot, scale_in_view):
+    microscope = Microscope()
+    qtbot.addWidget(microscope)
+    microscope.scale_in_view = scale_in_view
+    microscope.setQos(QosTier(fps=5, max_width=160))
+    assert microscope.decodeSize() == (160, 0)
+
+    full = QImage(640, 480, QImage.Format_RGB32)
+    full.fill(Qt.gray)
+    microscope.updateImageData(Frame(full))
+    assert microscope.displaySize() == QSize(640, 480)
+
+    # The same camera decoded at a quarter of its resolution
+    frame = Frame(full.scaled(160, 120))
+    frame.reduction = 4
+    microscope.updateImageData(frame)
+    assert microscope.displaySize() == QSize(640, 480)
@@ -0,0 +1,41 @@
+import pytest
+
+from qmicroscope.utils.scheduler import FrameScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_fetch_time_is_taken_out_of_the_wait():
+    clock = FakeClock()
+    scheduler = FrameScheduler(fps=10, clock=clock)
+    scheduler.start()
+    clock.now += 0.03  # fetch and decode
+    assert scheduler.next_frame() == pytest.approx(0.07)
+    assert scheduler.skipped == 0
+
+
+def test_overrun_skips_slots():
+    clock = FakeClock()
+    scheduler = FrameScheduler(fps=10, clock=clock)
+    scheduler.start()
+    clock.now += 0.25
+    # Slots at +0.1 and +0.2 have passed, the next frame is due at +0.3
+    assert scheduler.next_frame() == pytest.approx(0.05)
+    assert scheduler.skipped == 2
+
+
+def test_achieved_fps():
+    clock = FakeClock()
+    scheduler = FrameScheduler(fps=10, clock=clock)
+    scheduler.start()
+    for _ in range(11):
+        scheduler.count_frame()
+        clock.now += 0.2
+    assert scheduler.achieved_fps == pytest.approx(5)
+    assert scheduler.target_fps == pytest.approx(10)
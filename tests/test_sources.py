@@ -0,0 +1,106 @@
+import time
+
+import pytest
+
+from qmicroscope.utils.mailbox import FrameMailbox
+from qmicroscope.widgets.sources import SharedSource
+
+
+class Counting:
+    """Takes every frame put in a mailbox as soon as it is ready."""
+
+    def __init__(self, mailbox: FrameMailbox) -> None:
+        self.mailbox = mailbox
+        self.frames = []
+        mailbox.frameReady.connect(self.take)
+
+    def take(self) -> None:
+        frame = self.mailbox.take()
+        if frame is not None:
+            self.frames.append(frame)
+
+
+@pytest.fixture
+def source(camera_server):
+    camera_server.changing = True
+    source = SharedSource(camera_server.url("/shared.jpg"))
+    yield source
+    source.stop()
+
+
+def test_frames_fan_out_to_every_subscriber(qtbot, source):
+    first, second = Counting(FrameMailbox()), Counting(FrameMailbox())
+    source.subscribe(first.mailbox, 20)
+    source.subscribe(second.mailbox, 20)
+    assert source.subscribers == 2
+    qtbot.waitUntil(lambda: len(first.frames) >= 5 and len(second.frames) >= 5)
+    # One fetch and decode feeds both
+    assert source.thread.stats.frames < len(first.frames) + len(second.frames)
+
+
+def test_subscribers_get_their_own_frame_rate(qtbot, source):
+    fast, slow = Counting(FrameMailbox()), Counting(FrameMailbox())
+    source.subscribe(fast.mailbox, 20)
+    source.subscribe(slow.mailbox, 4)
+    assert source.thread.fps == 20
+    qtbot.wait(1000)
+    assert len(fast.frames) >= 10
+    assert 2 <= len(slow.frames) <= 6
+
+    source.set_fps(fast.mailbox, 2)
+    assert source.thread.fps == 4
+
+
+def test_pauses_when_no_subscriber_wants_frames(qtbot, camera_server, source):
+    subscriber = Counting(FrameMailbox())
+    source.subscribe(subscriber.mailbox, 20)
+    qtbot.waitUntil(lambda: len(subscriber.frames) >= 2)
+
+    source.set_fps(subscriber.mailbox, 0)
+    assert source.paused and source.running
+    qtbot.wait(100)
+    requests = camera_server.requests["/shared.jpg"]
+    qtbot.wait(300)
+    assert camera_server.requests["/shared.jpg"] == requests
+
+    source.set_fps(subscriber.mailbox, 20)
+    assert not source.paused
+    qtbot.waitUntil(lambda: camera_server.requests["/shared.jpg"] >= requests + 3)
+
+
+def test_unsubscribe_stops_a_slow_feed_promptly(qtbot, source):
+    subscriber = Counting(FrameMailbox())
+    source.subscribe(subscriber.mailbox, 0.5)
+    qtbot.waitUntil(lambda: len(subscriber.frames) >= 1)
+
+    start = time.monotonic()
+    source.unsubscribe(subscriber.mailbox)
+    assert time.monotonic() - start < 0.2
+    assert not source.running
+
+
+def test_resubscribe_while_stopping_restarts_the_feed(qtbot, camera_server, source):
+    subscriber = Counting(FrameMailbox())
+    source.subscribe(subscriber.mailbox, 20)
+    qtbot.waitUntil(lambda: len(subscriber.frames) >= 2)
+
+    # Ask the thread to stop without waiting for it, as a caller that doesn't
+    # block would, and subscribe again straight away
+    source.thread.stop()
+    source.subscribe(subscriber.mailbox, 20)
+    requests = camera_server.requests["/shared.jpg"]
+    qtbot.waitUntil(lambda: camera_server.requests["/shared.jpg"] >= requests + 3)
+    assert source.thread.isRunning()
+
+
+def test_slow_subscriber_gets_the_latest_frame(qtbot, camera_server, source):
+    fast, slow = Counting(FrameMailbox()), Counting(FrameMailbox())
+    source.subscribe(fast.mailbox, 20)
+    source.subscribe(slow.mailbox, 2)
+    qtbot.waitUntil(lambda: len(slow.frames) >= 1)
+
+    # The last change usually comes too soon after the slow subscriber's last
+    # frame, and the camera stops changing after it
+    camera_server.changing = False
+    qtbot.waitUntil(lambda: source.thread.unchanged_frames >= 2)
+    qtbot.waitUntil(lambda: slow.frames[-1] is fast.frames[-1], timeout=1000)
@@ -0,0 +1,56 @@
+from qtpy.QtGui import QImage
+
+from qmicroscope.microscope import Microscope
+from qmicroscope.plugins.stats_plugin import StatsPlugin
+from qmicroscope.utils.frame import Frame
+from qmicroscope.utils.stats import FrameStats
+
+
+def make_frame(sequence, timestamp, **timings):
+    frame = Frame(timestamp=timestamp)
+    frame.sequence = sequence
+    frame.timings.update(timings)
+    return frame
+
+
+def test_frame_stats(mocker):
+    clock = mocker.patch("qmicroscope.utils.stats.time.monotonic")
+    stats = FrameStats(window=4)
+    for i, sequence in enumerate([1, 2, 5, 6, 7, 8]):
+        clock.return_value = 10.0 + i * 0.1
+        stats.record(make_frame(sequence, clock.return_value - 0.05, decode=0.01))
+    stats.record_unchanged()
+
+    assert stats.frames == 6
+    assert stats.skipped == 2
+    assert abs(stats.fps - 10.0) < 1e-6
+    snapshot = stats.snapshot()
+    assert snapshot["unchanged"] == 1
+    assert abs(snapshot["latency"] - 0.05) < 1e-9
+    assert abs(snapshot["decode"] - 0.01) < 1e-9
+
+    # A feed that stopped has no frame rate
+    clock.return_value = 20.0
+    assert stats.fps == 0.0
+
+    stats.reset()
+    assert stats.snapshot()["frames"] == 0
+
+
+def test_microscope_frame_stats(qtbot):
+    microscope = Microscope(plugins=[StatsPlugin])
+    qtbot.addWidget(microscope)
+    image = QImage(8, 8, QImage.Format_RGB32)
+    for sequence in (1, 3, 4):
+        frame = Frame(image)
+        frame.sequence = sequence
+        microscope.updateImageData(frame)
+
+    stats = microscope.frameStats()
+    assert stats["display"]["frames"] == 3
+    assert stats["display"]["skipped"] == 1
+    assert "plugins" in stats["display"]
+    assert stats["source"]["frames"] == 0
+
+    text = microscope.plugins["StatsPlugin"].overlay_text()
+    assert "1 displaying" in text
@@ -0,0 +1,80 @@
+from qtpy.QtCore import QCoreApplication, QEvent, QPoint, QSettings, Qt
+from qtpy.QtGui import QImage
+
+from qmicroscope.container import Container
+from qmicroscope.utils.frame import Frame
+from qmicroscope.widgets.video_wall import VideoWall
+
+
+def make_wall(qtbot, count=6, columns=3):
+    wall = VideoWall(max_display_hz=100)
+    qtbot.addWidget(wall)
+    wall.columns = columns
+    wall.spacing = 2
+    for i in range(count):
+        wall.addTile(f"http://localhost/{i}.jpg", settings_group=f"Camera{i}")
+    wall.resize(302, 202)
+    return wall
+
+
+def test_tile_hit_testing(qtbot):
+    wall = make_wall(qtbot)
+    assert wall.rows == 2
+    assert wall.tileSize().width() == 99 and wall.tileSize().height() == 100
+    assert wall.tileRect(4).topLeft() == QPoint(101, 102)
+    assert wall.tileAt(QPoint(10, 10)) == 0
+    assert wall.tileAt(QPoint(150, 150)) == 4
+    # The spacing between tiles and the space after the last one hit nothing
+    assert wall.tileAt(QPoint(100, 10)) is None
+    assert wall.tileAt(QPoint(10, 101)) is None
+    assert wall.tileAt(QPoint(310, 10)) is None
+
+    with qtbot.waitSignal(wall.clicked_url) as blocker:
+        qtbot.mouseClick(wall, Qt.LeftButton, pos=QPoint(250, 150))
+    assert blocker.args == ["Camera5"]
+
+
+def test_frames_are_taken_once_per_tick(qtbot):
+    wall = make_wall(qtbot)
+    image = QImage(64, 48, QImage.Format_RGB32)
+    image.fill(Qt.red)
+    wall.show()
+    qtbot.waitExposed(wall)
+    for tile in wall.tiles[:3]:
+        tile.mailbox.put(Frame(image))
+    qtbot.waitUntil(lambda: wall.display_scheduler.ticks == 1)
+    assert [tile.image.isNull() for tile in wall.tiles] == [False] * 3 + [True] * 3
+
+    grab = wall.grab().toImage()
+    assert QImage(grab).pixelColor(wall.tileRect(0).center()) == Qt.red
+    assert QImage(grab).pixelColor(wall.tileRect(3).center()) == Qt.black
+
+
+def test_clear_deletes_mailboxes(qtbot):
+    wall = make_wall(qtbot)
+    children = len(wall.children())
+    for _ in range(3):
+        wall.clear()
+        for i in range(6):
+            wall.addTile(f"http://localhost/{i}.jpg")
+        QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    assert len(wall.children()) == children
+
+
+def test_container_wall_mode(qtbot, tmp_path):
+    settings = QSettings(str(tmp_path / "wall.ini"), QSettings.IniFormat)
+    settings.beginGroup("Container")
+    settings.setValue("cols", 4)
+    settings.setValue("rows", 2)
+    for i in range(8):
+        settings.setValue(f"Camera{i}/url", f"http://localhost/{i}.jpg")
+    settings.endGroup()
+
+    container = Container(wall=True)
+    qtbot.addWidget(container)
+    container.readSettings(settings)
+    assert container.microscope(0) is None
+    assert len(container.wall.tiles) == 8
+    assert container.wall.columns == 4
+    assert container.wall.tiles[7].url == "http://localhost/7.jpg"
+    assert container.wall.tiles[7].settings_group == "Container/Camera7"
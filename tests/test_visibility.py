@@ -0,0 +1,125 @@
+import pytest
+from qtpy.QtWidgets import QTabWidget, QWidget
+
+from qmicroscope.microscope import Microscope
+from qmicroscope.plugins.base_plugin import BasePlugin
+from qmicroscope.plugins.record_plugin import RecordPlugin
+
+@pytest.fixture
+def url(camera_server):
+    return camera_server.url("/visible.jpg")
+
+
+def test_hidden_microscope_pauses_acquisition(qtbot, camera_server, url):
+    microscope = Microscope()
+    qtbot.addWidget(microscope)
+    microscope.url = url
+    microscope.fps = 20
+    microscope.show()
+    qtbot.waitExposed(microscope)
+    microscope.acquire(True)
+    try:
+        qtbot.waitUntil(lambda: camera_server.requests["/visible.jpg"] >= 3)
+
+        microscope.hide()
+        assert microscope.source.paused
+        qtbot.wait(100)
+        requests = camera_server.requests["/visible.jpg"]
+        qtbot.wait(300)
+        assert camera_server.requests["/visible.jpg"] == requests
+
+        microscope.show()
+        assert not microscope.source.paused
+        qtbot.waitUntil(lambda: camera_server.requests["/visible.jpg"] >= requests + 3)
+
+        # A keep-alive trickle instead of pausing
+        microscope.hidden_fps = 2
+        microscope.hide()
+        assert not microscope.source.paused
+        assert microscope.videoThread.fps == 2
+    finally:
+        microscope.acquire(False)
+    assert not microscope.videoThread.isRunning()
+
+
+def test_plugins_keep_hidden_microscope_acquiring(qtbot):
+    microscope = Microscope(plugins=[BasePlugin])
+    qtbot.addWidget(microscope)
+    microscope.fps = 10
+    microscope.show()
+    qtbot.waitExposed(microscope)
+    microscope.hide()
+    assert microscope.acquisitionFps() == 0
+    microscope.plugins["BasePlugin"].keep_acquiring = True
+    assert microscope.acquisitionFps() == 10
+
+
+def test_recording_keeps_hidden_microscope_acquiring(
+    qtbot, mocker, camera_server, url, tmp_path
+):
+    microscope = Microscope(plugins=[RecordPlugin])
+    qtbot.addWidget(microscope)
+    record = microscope.plugins["RecordPlugin"]
+    record.filename = tmp_path / "output"
+    # Which codecs can be written depends on the OpenCV build, the writer isn't
+    # what is tested here
+    mocker.patch.object(
+        record.video_recorder_thread, "start", lambda path, *args: path.touch()
+    )
+    mocker.patch.object(record.video_recorder_thread, "stop")
+    microscope.url = url
+    microscope.fps = 10
+    microscope.show()
+    qtbot.waitExposed(microscope)
+    microscope.acquire(True)
+    try:
+        microscope.hide()
+        assert microscope.source.paused
+
+        record._set_record(True)
+        assert record.keep_acquiring
+        assert microscope.acquisitionFps() == 10
+        assert not microscope.source.paused
+        requests = camera_server.requests["/visible.jpg"]
+        qtbot.waitUntil(lambda: camera_server.requests["/visible.jpg"] >= requests + 3)
+
+        record._set_record(False)
+        assert not record.keep_acquiring
+        assert microscope.source.paused
+    finally:
+        microscope.acquire(False)
+    assert list(tmp_path.glob("output_*.mp4"))
+
+
+def test_microscope_in_unopened_tab_is_hidden(qtbot, camera_server, url):
+    tabs = QTabWidget()
+    qtbot.addWidget(tabs)
+    tabs.addTab(QWidget(), "First")
+    microscope = Microscope()
+    tabs.addTab(microscope, "Second")
+    microscope.url = url
+    microscope.fps = 20
+    # Acquiring before the window is shown, as applications usually do
+    microscope.acquire(True)
+    try:
+        tabs.show()
+        qtbot.waitExposed(tabs)
+        assert microscope.hidden
+        assert microscope.source.paused
+
+        tabs.setCurrentIndex(1)
+        assert not microscope.hidden
+        assert not microscope.source.paused
+        requests = camera_server.requests["/visible.jpg"]
+        qtbot.waitUntil(lambda: camera_server.requests["/visible.jpg"] >= requests + 3)
+    finally:
+        microscope.acquire(False)
+
+    # Acquiring after the window is shown
+    tabs.setCurrentIndex(0)
+    microscope.acquire(True)
+    try:
+        assert microscope.hidden
+        assert microscope.source.paused
+    finally:
+        microscope.acquire(False)